@@ -40,7 +40,8 @@ def get_skill_analyzer():
             skill_analyzer = SkillGapAnalyzer(
                 skill_embeddings_path=skill_embeddings_path,
                 job_skill_mapping_path=job_mapping_path,
-                similarity_threshold=Config.SKILL_SIMILARITY_THRESHOLD
+                similarity_threshold=Config.SKILL_SIMILARITY_THRESHOLD,
+                onnx_model_dir=Config.ONNX_MODEL_PATH if Config.USE_ONNX_ENCODER else None
             )
             logger.info("Skill analyzer initialized successfully")
         except Exception as e:
@@ -53,7 +54,7 @@ def get_skill_extractor():
     global skill_extractor
     if skill_extractor is None:
         try:
-            skill_extractor = SkillExtractor(Config.SPACY_MODEL_PATH)
+            skill_extractor = SkillExtractor(Config.SPACY_MODEL_PATH, gpu_id=Config.SPACY_GPU_ID)
             logger.info("Skill extractor initialized successfully")
         except Exception as e:
             logger.warning(f"Could not load spaCy model: {e}")
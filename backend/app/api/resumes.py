@@ -3,6 +3,8 @@ Resume management API endpoints
 """
 
 from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+import anyio
 import logging
 from datetime import datetime
 import asyncio
@@ -29,12 +31,24 @@ router = APIRouter(prefix="/resumes", tags=["Resume Management"])
 # Initialize skill extractor (will be loaded when first needed)
 skill_extractor = None
 
+# PDF/Word parsing is CPU-bound; cap how many run at once so a burst of
+# uploads can't take every threadpool worker from other requests
+TEXT_EXTRACTION_CONCURRENCY = 4
+text_extraction_limiter = None
+
+def get_text_extraction_limiter() -> anyio.CapacityLimiter:
+    """Get or create the limiter for concurrent text extraction"""
+    global text_extraction_limiter
+    if text_extraction_limiter is None:
+        text_extraction_limiter = anyio.CapacityLimiter(TEXT_EXTRACTION_CONCURRENCY)
+    return text_extraction_limiter
+
 def get_skill_extractor():
     """Get or initialize skill extractor"""
     global skill_extractor
     if skill_extractor is None:
         try:
-            skill_extractor = SkillExtractor(Config.SPACY_MODEL_PATH)
+            skill_extractor = SkillExtractor(Config.SPACY_MODEL_PATH, gpu_id=Config.SPACY_GPU_ID)
             logger.info("Skill extractor initialized successfully")
         except Exception as e:
             logger.warning(f"Could not load spaCy model, using fallback: {e}")
@@ -42,7 +56,9 @@ def get_skill_extractor():
             skill_extractor = None
     return skill_extractor
 
-async def process_resume_skills(resume_id: str, resume_text: str):
+# Plain def: background tasks that aren't coroutines run in the threadpool, so
+# model inference and database writes don't stall the event loop
+def process_resume_skills(resume_id: str, resume_text: str):
     """Background task to process resume and extract skills"""
     try:
         start_time = time.time()
@@ -60,24 +76,24 @@ async def process_resume_skills(resume_id: str, resume_text: str):
             # Convert to database format
             for skill_info in raw_skills:
                 # Find skill in database
-                skill_record = get_skill_by_name(skill_info['text'])
+                skill_record = get_skill_by_name(skill_info.text)
                 if skill_record:
                     skills_data.append({
                         'skill_id': skill_record['id'],
-                        'original_text': skill_info['text'],
-                        'confidence_score': skill_info['confidence'],
+                        'original_text': skill_info.text,
+                        'confidence_score': skill_info.confidence,
                         'match_type': 'exact',
-                        'position_start': skill_info.get('start'),
-                        'position_end': skill_info.get('end')
+                        'position_start': skill_info.start,
+                        'position_end': skill_info.end
                     })
                     
                     extracted_skills.append(ExtractedSkill(
-                        text=skill_info['text'],
+                        text=skill_info.text,
                         skill_name=skill_record['name'],
-                        confidence_score=skill_info['confidence'],
+                        confidence_score=skill_info.confidence,
                         match_type='exact',
-                        position_start=skill_info.get('start'),
-                        position_end=skill_info.get('end')
+                        position_start=skill_info.start,
+                        position_end=skill_info.end
                     ))
         else:
             # Fallback: Simple keyword matching
@@ -150,11 +166,17 @@ async def upload_resume(
                 detail="No filename provided"
             )
         
-        # Save file to disk
-        file_info = save_resume_file(file, current_user["id"])
+        # Save file to disk; file and database I/O run in the threadpool so
+        # they don't block the event loop
+        file_info = await run_in_threadpool(save_resume_file, file, current_user["id"])
         
         # Extract text from file
-        raw_text = extract_resume_text(file_info["file_path"], file_info["mime_type"])
+        raw_text = await anyio.to_thread.run_sync(
+            extract_resume_text,
+            file_info["file_path"],
+            file_info["mime_type"],
+            limiter=get_text_extraction_limiter()
+        )
         
         if not raw_text.strip():
             raise HTTPException(
@@ -163,7 +185,8 @@ async def upload_resume(
             )
         
         # Save resume to database
-        resume_id = save_resume(
+        resume_id = await run_in_threadpool(
+            save_resume,
             user_id=current_user["id"],
             filename=file_info["original_filename"],
             file_path=file_info["file_path"],
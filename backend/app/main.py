@@ -74,6 +74,22 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🛑 Shutting down Skill Gap Analyzer API...")
+
+    # Persist resume skill embeddings computed during this run
+    try:
+        from app.api import analysis
+        if analysis.skill_analyzer is not None:
+            analysis.skill_analyzer.save_embedding_cache()
+    except Exception as e:
+        logger.warning(f"⚠️ Could not save skill embedding cache: {e}")
+
+    # Stop the PDF extraction worker processes
+    try:
+        from app.utils.file_processor import shutdown_pdf_executor
+        shutdown_pdf_executor()
+    except Exception as e:
+        logger.warning(f"⚠️ Could not stop PDF workers: {e}")
+
     logger.info("✅ Application shutdown complete")
 
 # Create FastAPI app
@@ -97,7 +113,7 @@ app = FastAPI(
     - **Backend**: FastAPI, Python 3.8+
     - **ML/AI**: spaCy, SBERT, scikit-learn, TensorFlow
     - **Database**: MySQL with optimized schemas
-    - **Authentication**: JWT tokens with bcrypt
+    - **Authentication**: JWT tokens with Argon2id password hashing
     """,
     version="1.0.0",
     terms_of_service="https://skillgapanalyzer.com/terms",
@@ -1,16 +1,220 @@
 import pandas as pd
+import numpy as np
+import hashlib
 import json
+import os
 import re
+import shelve
 import spacy
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Tuple, Any
 from pathlib import Path
 import logging
 from fuzzywuzzy import fuzz
 from sentence_transformers import SentenceTransformer
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback when numba is not installed: run the plain Python function"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump when the extraction logic changes so cached results are recomputed
+EXTRACTION_CACHE_VERSION = 2
+
+# Skill list used by worker processes, loaded once per worker by _init_worker
+_worker_skill_list: List[str] = []
+_worker_skills_clean: List[str] = []
+_worker_exact_re = None
+
+def clean_text(text: str) -> str:
+    """Clean and normalize text"""
+    if pd.isna(text):
+        return ""
+    
+    # Remove special characters but keep important punctuation
+    text = re.sub(r'[^\w\s\.\-\+\#]', ' ', str(text))
+    
+    # Remove extra whitespace and normalize
+    text = re.sub(r'\s+', ' ', text).strip()
+    
+    return text
+
+def clean_series(series: pd.Series) -> pd.Series:
+    """Vectorized clean_text over a whole column"""
+    return (series.fillna('').astype(str)
+            .str.replace(r'[^\w\s\.\-\+\#]', ' ', regex=True)
+            .str.replace(r'\s+', ' ', regex=True)
+            .str.strip())
+
+def _compile_exact_pattern(skills_clean: List[str]) -> re.Pattern:
+    """
+    Compile all cleaned skill names into one alternation regex
+    
+    Longer names come first so they win over their prefixes at the same
+    position. Lookarounds are used instead of \\b so names ending in
+    punctuation (C++, C#) still match.
+    """
+    alternatives = sorted({skill for skill in skills_clean if skill}, key=len, reverse=True)
+    return re.compile(r'(?<!\w)(?:' + '|'.join(map(re.escape, alternatives)) + r')(?!\w)')
+
+def _match_skills(text: str, skill_list: List[str], skills_clean: List[str],
+                  exact_re: re.Pattern, threshold: float = 0.8) -> List[Dict]:
+    """Match skills against already-cleaned text using pre-cleaned skill names"""
+    extracted_skills = []
+    text_lower = text.lower()
+    
+    # Exact matches for every skill in a single scan of the text
+    exact_spans = {}
+    for match in exact_re.finditer(text_lower):
+        exact_spans.setdefault(match.group(0), []).append((match.start(), match.end()))
+    
+    # Tokenize text into words and phrases. Cleaned text is single-space
+    # separated, so each word's character offset follows from the word lengths
+    words = text.split()
+    word_lens = np.fromiter((len(word) for word in words), dtype=np.int32, count=len(words))
+    offsets = _offsets_from_words(word_lens).tolist()
+    
+    # Check for exact and fuzzy matches
+    for skill, skill_clean in zip(skill_list, skills_clean):
+        # Exact match
+        if skill_clean in exact_spans:
+            for start, end in exact_spans[skill_clean]:
+                extracted_skills.append({
+                    'text': skill,
+                    'start': start,
+                    'end': end,
+                    'label': 'SKILL',
+                    'confidence': 1.0
+                })
+        else:
+            # Fuzzy matching for similar skills
+            for start_pos, end_pos, word_group in _get_word_groups(words, len(skill_clean.split()), offsets):
+                word_group_text = ' '.join(word_group).lower()
+                
+                # Check fuzzy similarity
+                fuzzy_score = fuzz.ratio(skill_clean, word_group_text) / 100.0
+                
+                if fuzzy_score >= threshold:
+                    extracted_skills.append({
+                        'text': skill,
+                        'start': start_pos,
+                        'end': end_pos,
+                        'label': 'SKILL',
+                        'confidence': fuzzy_score
+                    })
+    
+    # Remove duplicates and overlapping matches
+    extracted_skills = _remove_overlapping_skills(extracted_skills)
+    
+    return extracted_skills
+
+def _get_word_groups(words: List[str], max_length: int,
+                     offsets: List[int]) -> List[Tuple[int, int, List[str]]]:
+    """Generate word groups of different lengths with their character spans"""
+    groups = []
+    for length in range(1, min(max_length + 1, 6)):  # Max 5 words per skill
+        for i in range(len(words) - length + 1):
+            # The group ends just before the space that follows its last word
+            groups.append((offsets[i], offsets[i + length] - 1, words[i:i + length]))
+    return groups
+
+@njit(cache=True)
+def _offsets_from_words(word_lens: np.ndarray) -> np.ndarray:
+    """Character offset of each word in the single-space-joined text"""
+    offsets = np.empty(word_lens.shape[0] + 1, dtype=np.int32)
+    offsets[0] = 0
+    for i in range(word_lens.shape[0]):
+        offsets[i + 1] = offsets[i] + word_lens[i] + 1
+    return offsets
+
+@njit(cache=True)
+def _prune_overlaps(starts: np.ndarray, ends: np.ndarray, confs: np.ndarray) -> np.ndarray:
+    """
+    Select non-overlapping spans, preferring higher confidence
+    
+    Accepted spans are kept sorted by start in preallocated buffers, so each
+    candidate only needs a binary search and a check against its neighbours.
+    Empty spans go in their own buffer since they can sit inside other spans.
+    
+    Returns:
+        Boolean mask of spans to keep
+    """
+    n = starts.shape[0]
+    order = np.argsort(-confs, kind='mergesort')
+    keep = np.zeros(n, dtype=np.bool_)
+    accepted_starts = np.empty(n, dtype=starts.dtype)
+    accepted_ends = np.empty(n, dtype=ends.dtype)
+    accepted_points = np.empty(n, dtype=starts.dtype)
+    n_accepted = 0
+    n_points = 0
+    
+    for idx in order:
+        start = starts[idx]
+        end = ends[idx]
+        pos = np.searchsorted(accepted_starts[:n_accepted], start)
+        
+        if pos > 0 and start < accepted_ends[pos - 1] and end > accepted_starts[pos - 1]:
+            continue
+        if pos < n_accepted and start < accepted_ends[pos] and end > accepted_starts[pos]:
+            continue
+        
+        if end > start:
+            # Reject if an accepted empty span lies strictly inside this one
+            point_pos = np.searchsorted(accepted_points[:n_points], start, side='right')
+            if point_pos < n_points and accepted_points[point_pos] < end:
+                continue
+            
+            accepted_starts[pos + 1:n_accepted + 1] = accepted_starts[pos:n_accepted].copy()
+            accepted_ends[pos + 1:n_accepted + 1] = accepted_ends[pos:n_accepted].copy()
+            accepted_starts[pos] = start
+            accepted_ends[pos] = end
+            n_accepted += 1
+        else:
+            point_pos = np.searchsorted(accepted_points[:n_points], start)
+            accepted_points[point_pos + 1:n_points + 1] = accepted_points[point_pos:n_points].copy()
+            accepted_points[point_pos] = start
+            n_points += 1
+        
+        keep[idx] = True
+    
+    return keep
+
+def _remove_overlapping_skills(skills: List[Dict]) -> List[Dict]:
+    """Remove overlapping skill matches, keeping the highest confidence"""
+    if not skills:
+        return skills
+    
+    starts = np.array([skill['start'] for skill in skills], dtype=np.int32)
+    ends = np.array([skill['end'] for skill in skills], dtype=np.int32)
+    confs = np.array([skill['confidence'] for skill in skills], dtype=np.float32)
+    
+    keep = _prune_overlaps(starts, ends, confs)
+    
+    # Return in confidence order, highest first
+    return [skills[i] for i in np.argsort(-confs, kind='mergesort') if keep[i]]
+
+def _init_worker(skills_db_path: str):
+    """Load and clean the skill list once in each worker process"""
+    global _worker_skill_list, _worker_skills_clean, _worker_exact_re
+    skills_df = pd.read_csv(skills_db_path)
+    _worker_skill_list = skills_df['Skills'].unique().tolist()
+    _worker_skills_clean = [clean_text(skill.lower()) for skill in _worker_skill_list]
+    _worker_exact_re = _compile_exact_pattern(_worker_skills_clean)
+
+def _process_chunk(texts: List[str]) -> List[List[Dict]]:
+    """Extract skills for a chunk of already-cleaned resume texts"""
+    return [_match_skills(text, _worker_skill_list, _worker_skills_clean, _worker_exact_re)
+            for text in texts]
+
 class SkillDataPreprocessor:
     def __init__(self, skills_db_path: str, resume_data_path: str):
         """
@@ -25,6 +229,14 @@ class SkillDataPreprocessor:
         self.skills_df = None
         self.resume_df = None
         self.skill_list = []
+        self.skills_clean = []
+        self._exact_re = None
+        self._skills_digest = ''
+        
+        # On-disk extraction cache, opened for the duration of process_all_data
+        self._extract_cache = None
+        self._cache_hits = 0
+        self._cache_misses = 0
         
         # Load sentence transformer for skill matching
         self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
@@ -39,6 +251,14 @@ class SkillDataPreprocessor:
             
             # Extract unique skills from skills database
             self.skill_list = self.skills_df['Skills'].unique().tolist()
+            self.skills_clean = [clean_text(skill.lower()) for skill in self.skill_list]
+            self._exact_re = _compile_exact_pattern(self.skills_clean)
+            self._skills_digest = hashlib.blake2b(
+                '\n'.join(map(str, self.skill_list)).encode('utf-8'), digest_size=16
+            ).hexdigest()
+            
+            # Clean every resume once up front with vectorized string ops
+            self.resume_df['Resume_clean'] = clean_series(self.resume_df['Resume'])
             
             logger.info(f"Loaded {len(self.skills_df)} skill entries")
             logger.info(f"Loaded {len(self.resume_df)} resume entries")
@@ -50,16 +270,7 @@ class SkillDataPreprocessor:
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
-        if pd.isna(text):
-            return ""
-        
-        # Remove extra whitespace and normalize
-        text = re.sub(r'\s+', ' ', str(text).strip())
-        
-        # Remove special characters but keep important punctuation
-        text = re.sub(r'[^\w\s\.\-\+\#]', ' ', text)
-        
-        return text
+        return clean_text(text)
     
     def extract_skills_from_text(self, text: str, threshold: float = 0.8) -> List[Dict]:
         """
@@ -72,167 +283,126 @@ class SkillDataPreprocessor:
         Returns:
             List of extracted skills with positions
         """
-        text = self.clean_text(text)
-        extracted_skills = []
+        text = clean_text(text)
         
-        # Tokenize text into words and phrases
-        words = text.split()
+        if self._extract_cache is None:
+            return _match_skills(text, self.skill_list, self.skills_clean, self._exact_re, threshold)
         
-        # Check for exact and fuzzy matches
-        for skill in self.skill_list:
-            skill_clean = self.clean_text(skill.lower())
-            text_lower = text.lower()
-            
-            # Exact match
-            if skill_clean in text_lower:
-                start = text_lower.find(skill_clean)
-                end = start + len(skill_clean)
-                extracted_skills.append({
-                    'text': skill,
-                    'start': start,
-                    'end': end,
-                    'label': 'SKILL',
-                    'confidence': 1.0
-                })
-            else:
-                # Fuzzy matching for similar skills
-                for i, word_group in enumerate(self._get_word_groups(words, len(skill_clean.split()))):
-                    word_group_text = ' '.join(word_group).lower()
-                    
-                    # Check fuzzy similarity
-                    fuzzy_score = fuzz.ratio(skill_clean, word_group_text) / 100.0
-                    
-                    if fuzzy_score >= threshold:
-                        # Calculate position in original text
-                        start_pos = text_lower.find(word_group_text)
-                        if start_pos != -1:
-                            extracted_skills.append({
-                                'text': skill,
-                                'start': start_pos,
-                                'end': start_pos + len(word_group_text),
-                                'label': 'SKILL',
-                                'confidence': fuzzy_score
-                            })
-        
-        # Remove duplicates and overlapping matches
-        extracted_skills = self._remove_overlapping_skills(extracted_skills)
-        
-        return extracted_skills
-    
-    def _get_word_groups(self, words: List[str], max_length: int) -> List[List[str]]:
-        """Generate word groups of different lengths"""
-        groups = []
-        for length in range(1, min(max_length + 1, 6)):  # Max 5 words per skill
-            for i in range(len(words) - length + 1):
-                groups.append(words[i:i + length])
-        return groups
-    
-    def _remove_overlapping_skills(self, skills: List[Dict]) -> List[Dict]:
-        """Remove overlapping skill matches, keeping the highest confidence"""
-        if not skills:
-            return skills
-        
-        # Sort by confidence descending
-        skills = sorted(skills, key=lambda x: x['confidence'], reverse=True)
-        
-        filtered_skills = []
-        for skill in skills:
-            # Check for overlap with already accepted skills
-            overlap = False
-            for accepted in filtered_skills:
-                if (skill['start'] < accepted['end'] and 
-                    skill['end'] > accepted['start']):
-                    overlap = True
-                    break
-            
-            if not overlap:
-                filtered_skills.append(skill)
+        key = self._cache_key(text, threshold)
+        cached = self._extract_cache.get(key)
+        if cached is not None:
+            self._cache_hits += 1
+            return cached
         
-        return filtered_skills
+        self._cache_misses += 1
+        result = _match_skills(text, self.skill_list, self.skills_clean, self._exact_re, threshold)
+        self._extract_cache[key] = result
+        return result
     
-    def create_spacy_training_data(self, output_path: str):
+    def _cache_key(self, text: str, threshold: float = 0.8) -> str:
+        """Cache key for cleaned text, invalidated when the skills or threshold change"""
+        key_source = f"{EXTRACTION_CACHE_VERSION}|{self._skills_digest}|{threshold}|{text}"
+        return hashlib.blake2b(key_source.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _single_pass(self, output_path: Path) -> Dict[str, int]:
         """
-        Convert resume data to spaCy training format
+        Walk each dataset once, streaming the spaCy training data to disk and
+        building the job-skill mapping
         
         Args:
-            output_path: Path to save the training data
+            output_path: Directory to save the generated files
+            
+        Returns:
+            Counts of training examples and job professions created
         """
-        training_data = []
-        
         logger.info("Creating spaCy training data...")
         
-        for idx, row in self.resume_df.iterrows():
-            resume_text = self.clean_text(row['Resume'])
-            
-            if len(resume_text.strip()) == 0:
+        texts = self.resume_df['Resume_clean'].tolist()
+        categories = self.resume_df.get('Category', pd.Series('Unknown', index=self.resume_df.index)).tolist()
+        
+        # Resolve cached and duplicate resumes first so only unseen texts
+        # are sent to the workers
+        keys = [self._cache_key(text) if text else None for text in texts]
+        results = {}
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key is None:
+                continue
+            if key in results or key in pending:
+                self._cache_hits += 1
                 continue
             
-            # Extract skills from resume text
-            skills = self.extract_skills_from_text(resume_text)
+            cached = self._extract_cache.get(key) if self._extract_cache is not None else None
+            if cached is not None:
+                results[key] = cached
+                self._cache_hits += 1
+            else:
+                pending[key] = text
+                self._cache_misses += 1
+        
+        # Extraction is independent per resume, so split the remaining texts
+        # across worker processes; each worker loads its own copy of the skill list.
+        # No more workers than texts, and no pool at all when everything was cached
+        pending_keys = list(pending)
+        if pending_keys:
+            n_workers = min(os.cpu_count() or 1, len(pending_keys))
+            batches = [[pending_keys[i] for i in rows]
+                       for rows in np.array_split(np.arange(len(pending_keys)), n_workers)]
             
-            if skills:
+            processed = len(texts) - len(pending_keys)
+            with ProcessPoolExecutor(max_workers=n_workers,
+                                     initializer=_init_worker,
+                                     initargs=(self.skills_db_path,)) as executor:
+                text_batches = [[pending[key] for key in batch] for batch in batches]
+                for batch, batch_skills in zip(batches, executor.map(_process_chunk, text_batches)):
+                    for key, skills in zip(batch, batch_skills):
+                        results[key] = skills
+                        if self._extract_cache is not None:
+                            self._extract_cache[key] = skills
+                    processed += len(batch)
+                    logger.info(f"Processed {processed} resumes")
+        
+        training_file = output_path / 'spacy_training_data.json'
+        training_examples = 0
+        with open(training_file, 'w', encoding='utf-8') as f:
+            # Stream the JSON array so the examples are not serialized all at once
+            f.write('[')
+            for key, text, category in zip(keys, texts, categories):
+                skills = results.get(key) if key is not None else None
+                if not skills:
+                    continue
+                
                 # Create entities list for spaCy
                 entities = [(skill['start'], skill['end'], skill['label']) 
                            for skill in skills]
                 
-                training_data.append({
-                    'text': resume_text,
+                example = {
+                    'text': text,
                     'entities': entities,
-                    'category': row.get('Category', 'Unknown')
-                })
-            
-            if (idx + 1) % 100 == 0:
-                logger.info(f"Processed {idx + 1} resumes")
-        
-        # Save training data
-        output_file = Path(output_path) / 'spacy_training_data.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(training_data, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"Created {len(training_data)} training examples")
-        logger.info(f"Training data saved to {output_file}")
-        
-        return training_data
-    
-    def create_skill_embeddings(self, output_path: str):
-        """Create embeddings for all skills for semantic matching"""
-        logger.info("Creating skill embeddings...")
-        
-        # Clean skill names
-        clean_skills = [self.clean_text(skill) for skill in self.skill_list]
-        
-        # Generate embeddings
-        embeddings = self.sentence_model.encode(clean_skills)
-        
-        # Create skill-embedding mapping
-        skill_embeddings = {
-            'skills': self.skill_list,
-            'clean_skills': clean_skills,
-            'embeddings': embeddings.tolist()
-        }
-        
-        # Save embeddings
-        output_file = Path(output_path) / 'skill_embeddings.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(skill_embeddings, f, indent=2, ensure_ascii=False)
+                    'category': category
+                }
+                f.write(',\n' if training_examples else '\n')
+                f.write(json.dumps(example, ensure_ascii=False))
+                training_examples += 1
+            f.write('\n]\n')
         
-        logger.info(f"Created embeddings for {len(self.skill_list)} skills")
-        logger.info(f"Embeddings saved to {output_file}")
+        logger.info(f"Created {training_examples} training examples")
+        logger.info(f"Training data saved to {training_file}")
         
-        return skill_embeddings
-    
-    def create_job_skill_mapping(self, output_path: str):
-        """Create mapping between job professions and required skills"""
         logger.info("Creating job-skill mapping...")
         
         job_skills = {}
         
-        for _, row in self.skills_df.iterrows():
-            job_profession = row['Job Profession']
-            skill = row['Skills']
-            task = row.get('Tasks he wanted to learn', '')
-            hot_tech = row.get('Hot Technology', 'N') == 'Y'
-            in_demand = row.get('In Demand', 'N') == 'Y'
+        # Column names contain spaces, so unpack plain tuples; optional
+        # columns that are missing from the CSV come back empty
+        skill_rows = self.skills_df.reindex(
+            columns=['Job Profession', 'Skills', 'Tasks he wanted to learn', 'Hot Technology', 'In Demand'],
+            fill_value=''
+        )
+        
+        for job_profession, skill, task, hot_tech, in_demand in skill_rows.itertuples(index=False, name=None):
+            hot_tech = hot_tech == 'Y'
+            in_demand = in_demand == 'Y'
             
             if job_profession not in job_skills:
                 job_skills[job_profession] = {
@@ -261,35 +431,89 @@ class SkillDataPreprocessor:
                 job_skills[job_profession]['in_demand_skills'].append(skill)
         
         # Save job-skill mapping
-        output_file = Path(output_path) / 'job_skill_mapping.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
+        mapping_file = output_path / 'job_skill_mapping.json'
+        with open(mapping_file, 'w', encoding='utf-8') as f:
             json.dump(job_skills, f, indent=2, ensure_ascii=False)
         
         logger.info(f"Created mapping for {len(job_skills)} job professions")
-        logger.info(f"Job-skill mapping saved to {output_file}")
+        logger.info(f"Job-skill mapping saved to {mapping_file}")
         
-        return job_skills
+        return {
+            'training_examples': training_examples,
+            'job_professions': len(job_skills)
+        }
+    
+    def create_skill_embeddings(self, output_path: str):
+        """
+        Create embeddings for all skills for semantic matching
+        
+        Besides the JSON file, writes an int8 copy of the embeddings
+        (skill_embeddings_int8.npy) with one float16 scale per vector
+        (skill_embeddings_scales.npy). Consumers recover similarities with
+        (q_a.astype(np.int32) @ q_b.astype(np.int32).T) * (s_a @ s_b.T),
+        accumulating in int32 so the int8 products cannot overflow.
+        """
+        logger.info("Creating skill embeddings...")
+        
+        # Clean skill names
+        clean_skills = [self.clean_text(skill) for skill in self.skill_list]
+        
+        # Generate unit-length embeddings so dot products are cosine similarities
+        embeddings = self.sentence_model.encode(clean_skills, normalize_embeddings=True)
+        
+        # Quantize each vector to int8 with its own max-abs scale
+        scales = np.abs(embeddings).max(axis=1, keepdims=True) / 127.0
+        scales = np.maximum(scales, np.finfo(np.float32).tiny)
+        quantized = np.round(embeddings / scales).astype(np.int8)
+        np.save(Path(output_path) / 'skill_embeddings_int8.npy', quantized)
+        np.save(Path(output_path) / 'skill_embeddings_scales.npy', scales.astype(np.float16))
+        
+        # Create skill-embedding mapping
+        skill_embeddings = {
+            'skills': self.skill_list,
+            'clean_skills': clean_skills,
+            'embeddings': embeddings.tolist()
+        }
+        
+        # Save embeddings
+        output_file = Path(output_path) / 'skill_embeddings.json'
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(skill_embeddings, f, indent=2, ensure_ascii=False)
+        
+        logger.info(f"Created embeddings for {len(self.skill_list)} skills")
+        logger.info(f"Embeddings saved to {output_file}")
+        
+        return skill_embeddings
     
     def process_all_data(self, output_dir: str):
         """Process all data and create all necessary files"""
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        # Create spaCy training data
-        training_data = self.create_spacy_training_data(output_path)
+        # Reuse skill extraction results from earlier runs
+        self._extract_cache = shelve.open(str(output_path / '.extract_cache'))
+        self._cache_hits = 0
+        self._cache_misses = 0
+        try:
+            # Create spaCy training data and job-skill mapping
+            counts = self._single_pass(output_path)
+        finally:
+            self._extract_cache.close()
+            self._extract_cache = None
+        
+        lookups = self._cache_hits + self._cache_misses
+        logger.info(f"Extraction cache hit rate: {self._cache_hits / max(lookups, 1):.1%} "
+                    f"({self._cache_hits}/{lookups})")
         
         # Create skill embeddings
-        embeddings = self.create_skill_embeddings(output_path)
-        
-        # Create job-skill mapping
-        job_mapping = self.create_job_skill_mapping(output_path)
+        self.create_skill_embeddings(output_path)
         
         # Create summary statistics
         stats = {
             'total_resumes': len(self.resume_df),
             'total_skills': len(self.skill_list),
-            'total_job_professions': len(self.skills_df['Job Profession'].unique()),
-            'training_examples_created': len(training_data),
+            'total_job_professions': counts['job_professions'],
+            'training_examples_created': counts['training_examples'],
             'categories': self.resume_df['Category'].value_counts().to_dict()
         }
         
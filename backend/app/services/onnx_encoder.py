@@ -0,0 +1,121 @@
+"""
+ONNX Runtime sentence encoder with int8 dynamic quantization
+"""
+
+import logging
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+QUANTIZED_FILE_SUFFIX = "quantized"
+
+class OnnxSentenceEncoder:
+    """
+    Drop-in replacement for SentenceTransformer.encode backed by a quantized
+    ONNX export of the same model (mean pooling, as used by MiniLM SBERT models)
+    """
+
+    def __init__(self, model_name: str, model_dir: str, max_length: int = 128):
+        """
+        Initialize the encoder, exporting and quantizing the model on first use
+
+        Args:
+            model_name: Sentence-transformers model name or hub id
+            model_dir: Directory holding the exported int8 ONNX model
+            max_length: Maximum token length per sentence
+        """
+        if not ONNX_AVAILABLE:
+            raise ImportError("optimum[onnxruntime] is required for the ONNX encoder")
+
+        self.model_dir = Path(model_dir)
+        self.max_length = max_length
+
+        if not any(self.model_dir.glob(f"*{QUANTIZED_FILE_SUFFIX}.onnx")):
+            self._export(model_name)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            self.model_dir,
+            file_name=next(self.model_dir.glob(f"*{QUANTIZED_FILE_SUFFIX}.onnx")).name,
+            provider="CPUExecutionProvider"
+        )
+        logger.info(f"Loaded ONNX encoder from {self.model_dir}")
+
+    def _export(self, model_name: str):
+        """Export the model to ONNX and apply int8 dynamic quantization"""
+        model_id = model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+        logger.info(f"Exporting {model_id} to ONNX in {self.model_dir}")
+
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        model = ORTModelForFeatureExtraction.from_pretrained(model_id, export=True)
+        model.save_pretrained(self.model_dir)
+        AutoTokenizer.from_pretrained(model_id).save_pretrained(self.model_dir)
+
+        quantizer = ORTQuantizer.from_pretrained(self.model_dir)
+        quantization_config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer.quantize(
+            save_dir=self.model_dir,
+            quantization_config=quantization_config,
+            file_suffix=QUANTIZED_FILE_SUFFIX
+        )
+
+    def encode(self,
+               sentences: List[str],
+               batch_size: int = 64,
+               convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False,
+               show_progress_bar: bool = False) -> np.ndarray:
+        """
+        Encode sentences into mean-pooled embeddings
+
+        Args:
+            sentences: Sentences to encode
+            batch_size: Number of sentences per forward pass
+            convert_to_numpy: Kept for SentenceTransformer compatibility
+            normalize_embeddings: Return unit-length embeddings
+            show_progress_bar: Kept for SentenceTransformer compatibility
+
+        Returns:
+            float32 array of shape (len(sentences), dim)
+        """
+        # Sort by length so each batch pads as little as possible
+        order = np.argsort([-len(sentence) for sentence in sentences], kind='stable')
+        batches = []
+
+        for start in range(0, len(sentences), batch_size):
+            batch = [sentences[i] for i in order[start:start + batch_size]]
+            inputs = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np"
+            )
+            token_embeddings = self.model(**inputs).last_hidden_state
+
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / mask.sum(axis=1).clip(min=1e-9)
+            batches.append(pooled.astype(np.float32))
+
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+
+        # Scatter back to the caller's order
+        embeddings = np.empty((len(sentences), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.concatenate(batches)
+
+        if normalize_embeddings:
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True).clip(min=1e-12)
+
+        return embeddings
@@ -1,21 +1,214 @@
 import json
+import os
+import re
+import threading
 import numpy as np
-from typing import List, Dict, Tuple, Any, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import List, Dict, Tuple, Any, Optional, Union
 from pathlib import Path
 import logging
+from functools import lru_cache
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from fuzzywuzzy import fuzz
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from sklearn.decomposition import PCA
-import matplotlib.pyplot as plt
-import seaborn as sns
+from rapidfuzz import process, fuzz
+
+from .onnx_encoder import OnnxSentenceEncoder
+
+# Either encoder can back sbert_model; callers may only rely on their shared encode() API
+SentenceEncoder = Union[SentenceTransformer, OnnxSentenceEncoder]
+
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Fallback when numba is not installed: run the plain Python function"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Below this many master skills an exact GEMM is cheaper than an ANN index
+FAISS_MIN_SKILLS = 10000
+
+# Below this many skills the regex classifier beats spinning up numba threads
+NUMBA_MIN_SKILLS = 512
+
+# Category keywords for ordering the learning path (matched as substrings)
+LEARNING_PATH_CATEGORIES = {
+    "programming": ["Python", "Java", "JavaScript", "C++", "R"],
+    "data_science": ["Machine Learning", "Deep Learning", "Statistics", "Data Analysis"],
+    "web": ["HTML", "CSS", "React", "Angular", "Node.js"],
+    "database": ["SQL", "MySQL", "PostgreSQL", "MongoDB"],
+    "cloud": ["AWS", "Azure", "Google Cloud", "Docker", "Kubernetes"],
+    "tools": ["Git", "Docker", "Jenkins", "Tableau"]
+}
+
+# Technical areas for the skill breakdown, checked in order (matched as substrings)
+SKILL_AREA_KEYWORDS = {
+    "Programming Languages": ['python', 'java', 'javascript', 'c++', 'r', 'sql'],
+    "Machine Learning/AI": ['machine learning', 'deep learning', 'tensorflow', 'scikit', 'neural'],
+    "Web Technologies": ['html', 'css', 'react', 'angular', 'node', 'express'],
+    "Databases": ['mysql', 'postgresql', 'mongodb', 'database', 'sql'],
+    "Cloud & DevOps": ['aws', 'azure', 'cloud', 'docker', 'kubernetes'],
+    "Data Analysis": ['tableau', 'power bi', 'excel', 'analytics', 'statistics']
+}
+
+def _compile_keyword_patterns(categories: Dict[str, List[str]]) -> List[Tuple[str, "re.Pattern"]]:
+    """Compile one lowercase substring alternation per category, keeping category order"""
+    return [
+        (category, re.compile('|'.join(re.escape(keyword.lower()) for keyword in keywords)))
+        for category, keywords in categories.items()
+    ]
+
+# How many nice-to-have skills make it into the priority list and learning path
+MAX_NICE_TO_HAVE_PRIORITIES = 5
+MAX_NICE_TO_HAVE_IN_PATH = 3
+
+# Static part of the proficiency gauge; only the value changes per analysis
+_GAUGE_LAYOUT = {
+    'type': 'indicator',
+    'mode': "gauge+number+delta",
+    'domain': {'x': [0, 1], 'y': [0, 1]},
+    'title': {'text': "Skill Proficiency Score"},
+    'delta': {'reference': 80},
+    'gauge': {
+        'axis': {'range': [None, 100]},
+        'bar': {'color': "darkblue"},
+        'steps': [
+            {'range': [0, 50], 'color': "lightgray"},
+            {'range': [50, 80], 'color': "yellow"},
+            {'range': [80, 100], 'color': "green"}],
+        'threshold': {
+            'line': {'color': "red", 'width': 4},
+            'thickness': 0.75,
+            'value': 90}}
+}
+
+_GAP_BAR_CATEGORIES = ["Present Skills", "Critical Missing", "Important Missing", "Nice-to-have Missing"]
+_GAP_BAR_COLORS = ["green", "red", "orange", "lightblue"]
+
+@lru_cache(maxsize=1)
+def _plotly_template() -> Dict[str, Any]:
+    """Default plotly template as a plain dict, resolved once per process"""
+    import plotly.io as pio
+    return pio.templates[pio.templates.default].to_plotly_json()
+
+def _figure_to_json(data: List[Dict[str, Any]], layout: Dict[str, Any]) -> str:
+    """Serialize a figure built from plain dicts, skipping plotly's schema validation"""
+    import plotly.io as pio
+    return pio.to_json(
+        {'data': data, 'layout': {'template': _plotly_template(), **layout}},
+        validate=False,
+        engine="orjson" if ORJSON_AVAILABLE else "json"
+    )
+
+def _read_json(path) -> Any:
+    """Parse a JSON file, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+_LEARNING_PATH_PATTERNS = _compile_keyword_patterns(LEARNING_PATH_CATEGORIES)
+_SKILL_AREA_PATTERNS = _compile_keyword_patterns(SKILL_AREA_KEYWORDS)
+
+def _match_category(skill: str, patterns: List[Tuple[str, "re.Pattern"]], default: str) -> str:
+    """Return the first category whose keywords occur in the skill name"""
+    skill_lower = skill.lower()
+    for category, pattern in patterns:
+        if pattern.search(skill_lower):
+            return category
+    return default
+
+def _pack_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack lowercased strings into one UTF-8 byte buffer plus row offsets"""
+    encoded = [string.lower().encode('utf-8') for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(data) for data in encoded])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+def _keyword_tables(categories: Dict[str, List[str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Flatten category keywords, in category order, for _categorize_packed"""
+    keywords, keyword_categories = [], []
+    for category_idx, category_keywords in enumerate(categories.values()):
+        keywords.extend(category_keywords)
+        keyword_categories.extend([category_idx] * len(category_keywords))
+    keyword_bytes, keyword_offsets = _pack_strings(keywords)
+    return keyword_bytes, keyword_offsets, np.array(keyword_categories, dtype=np.int32)
+
+@njit(parallel=True, cache=True)
+def _categorize_packed(skill_bytes, skill_offsets, keyword_bytes, keyword_offsets, keyword_categories):
+    """
+    Category index of the first keyword found in each skill, or -1
+    
+    Keywords are ordered by category, so the first keyword hit is also the
+    first matching category. Byte-level substring search gives the same
+    result as str containment on UTF-8 text.
+    """
+    n_skills = len(skill_offsets) - 1
+    n_keywords = len(keyword_offsets) - 1
+    result = np.full(n_skills, -1, dtype=np.int32)
+    
+    for i in prange(n_skills):
+        skill_start = skill_offsets[i]
+        skill_end = skill_offsets[i + 1]
+        for k in range(n_keywords):
+            keyword_start = keyword_offsets[k]
+            keyword_len = keyword_offsets[k + 1] - keyword_start
+            found = False
+            for start in range(skill_start, skill_end - keyword_len + 1):
+                j = 0
+                while j < keyword_len and skill_bytes[start + j] == keyword_bytes[keyword_start + j]:
+                    j += 1
+                if j == keyword_len:
+                    found = True
+                    break
+            if found:
+                result[i] = keyword_categories[k]
+                break
+    
+    return result
+
+_LEARNING_PATH_TABLES = _keyword_tables(LEARNING_PATH_CATEGORIES)
+_SKILL_AREA_TABLES = _keyword_tables(SKILL_AREA_KEYWORDS)
+
+def _match_categories(skills: List[str],
+                      patterns: List[Tuple[str, "re.Pattern"]],
+                      tables: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                      default: str) -> List[str]:
+    """Categorize many skills, using the numba kernel for large batches"""
+    if not NUMBA_AVAILABLE or len(skills) < NUMBA_MIN_SKILLS:
+        return [_match_category(skill, patterns, default) for skill in skills]
+    
+    names = [category for category, _ in patterns] + [default]
+    indices = _categorize_packed(*_pack_strings(skills), *tables)
+    return [names[idx] for idx in indices]
+
 class SkillGapAnalyzer:
     """
     Advanced skill gap analyzer using semantic similarity and machine learning
@@ -25,7 +218,11 @@ class SkillGapAnalyzer:
                  skill_embeddings_path: str,
                  job_skill_mapping_path: str,
                  sbert_model_name: str = "all-MiniLM-L6-v2",
-                 similarity_threshold: float = 0.7):
+                 similarity_threshold: float = 0.7,
+                 embedding_cache_size: int = 10000,
+                 quantized_similarity: bool = False,
+                 fuzzy_skip_threshold: float = 0.9,
+                 onnx_model_dir: Optional[str] = None):
         """
         Initialize the skill gap analyzer
         
@@ -34,44 +231,249 @@ class SkillGapAnalyzer:
             job_skill_mapping_path: Path to job-skill mapping JSON
             sbert_model_name: Name of the sentence transformer model
             similarity_threshold: Threshold for skill matching
+            embedding_cache_size: Max number of resume skill embeddings kept in memory
+            quantized_similarity: Score against int8-quantized skill embeddings
+            fuzzy_skip_threshold: Semantic score above which fuzzy matching is skipped
+            onnx_model_dir: Encode with a quantized ONNX export stored here instead of PyTorch
         """
         self.skill_embeddings_path = skill_embeddings_path
         self.job_skill_mapping_path = job_skill_mapping_path
         self.similarity_threshold = similarity_threshold
-        
-        # Load SBERT model
-        self.sbert_model = SentenceTransformer(sbert_model_name)
+        self.sbert_model_name = sbert_model_name
+        self.onnx_model_dir = onnx_model_dir
+        # Cached embeddings are only reusable with the same encoder
+        self._encoder_id = f"{sbert_model_name}+onnx-int8" if onnx_model_dir else sbert_model_name
+        self.quantized_similarity = quantized_similarity
+        self.fuzzy_skip_threshold = fuzzy_skip_threshold
+        
+        # SBERT model is loaded on first encode
+        self._sbert_model: Optional[SentenceEncoder] = None
+        
+        # LRU cache of resume skill string -> embedding, persisted next to
+        # the skill embeddings between runs
+        self.embedding_cache_size = embedding_cache_size
+        self._emb_cache = OrderedDict()
+        # Requests share one analyzer across threads
+        self._emb_cache_lock = threading.Lock()
+        self._emb_cache_path = Path(skill_embeddings_path).with_name('skill_emb_cache.npz')
+        self._load_embedding_cache()
         
         # Initialize data structures
         self.skill_embeddings = None
+        self._skill_emb_norm = None
+        self._skill_emb_i8 = None
+        self._skill_scales = None
+        self._faiss_index = None
         self.skill_list = []
+        self._skill_list_lower = []
         self.job_skill_mapping = {}
+        self._job_index = {}
         
         # Load pre-computed data
         self.load_skill_data()
     
+    @property
+    def sbert_model(self) -> SentenceEncoder:
+        """SBERT model, loaded on first use"""
+        if self._sbert_model is None and self.onnx_model_dir:
+            try:
+                self._sbert_model = OnnxSentenceEncoder(self.sbert_model_name, self.onnx_model_dir)
+            except Exception as e:
+                logger.warning(f"Could not load ONNX encoder, falling back to PyTorch: {e}")
+                self.onnx_model_dir = None
+                self._encoder_id = self.sbert_model_name
+        if self._sbert_model is None:
+            self._sbert_model = self._load_sbert_model(self.sbert_model_name)
+        return self._sbert_model
+    
+    @staticmethod
+    def _load_sbert_model(model_name: str) -> SentenceTransformer:
+        """Load the SBERT model, in half precision on GPU when one is available"""
+        model = SentenceTransformer(model_name)
+        
+        try:
+            if TORCH_AVAILABLE and torch.cuda.is_available():
+                model = model.to('cuda').half()
+            elif TORCH_AVAILABLE:
+                # Leave cores free for the batch post-processing threads
+                torch.set_num_threads(max(1, (os.cpu_count() or 1) // 2))
+        except Exception as e:
+            logger.warning(f"Could not move SBERT model to GPU: {e}")
+        
+        try:
+            # Fused attention kernels; needs the optimum package
+            transformer = model._first_module()
+            transformer.auto_model = transformer.auto_model.to_bettertransformer()
+        except Exception as e:
+            logger.info(f"BetterTransformer not enabled for SBERT model: {e}")
+        
+        return model
+    
     def load_skill_data(self):
         """Load skill embeddings and job-skill mapping"""
         try:
             # Load skill embeddings
-            with open(self.skill_embeddings_path, 'r', encoding='utf-8') as f:
-                embedding_data = json.load(f)
-            
-            self.skill_list = embedding_data['skills']
-            self.skill_embeddings = np.array(embedding_data['embeddings'])
+            self._load_skill_embeddings()
+            if self.quantized_similarity:
+                self._skill_emb_i8, self._skill_scales = self._quantize(self._skill_emb_norm)
+            elif FAISS_AVAILABLE and len(self.skill_list) >= FAISS_MIN_SKILLS:
+                self._faiss_index = self._build_faiss_index(self._skill_emb_norm)
+            self._skill_list_lower = [skill.lower() for skill in self.skill_list]
             
             logger.info(f"Loaded embeddings for {len(self.skill_list)} skills")
             
             # Load job-skill mapping
-            with open(self.job_skill_mapping_path, 'r', encoding='utf-8') as f:
-                self.job_skill_mapping = json.load(f)
+            self.job_skill_mapping = _read_json(self.job_skill_mapping_path)
             
             logger.info(f"Loaded mapping for {len(self.job_skill_mapping)} job professions")
             
+            self._job_index = {
+                job: self._index_job_requirements(requirements)
+                for job, requirements in self.job_skill_mapping.items()
+            }
+            
         except Exception as e:
             logger.error(f"Error loading skill data: {e}")
             raise
     
+    def _load_skill_embeddings(self):
+        """
+        Load skill names and normalized embeddings
+        
+        The embeddings JSON is parsed once and converted to a normalized
+        float16 .npy sidecar plus a small JSON list of skill names. Later
+        loads read the half-size .npy and upcast it to float32 once.
+        """
+        json_path = Path(self.skill_embeddings_path)
+        npy_path = json_path.with_suffix('.npy')
+        names_path = json_path.with_name(f"{json_path.stem}_skills.json")
+        
+        sidecars_exist = npy_path.exists() and names_path.exists()
+        if sidecars_exist and (not json_path.exists() or
+                               npy_path.stat().st_mtime >= json_path.stat().st_mtime):
+            self.skill_list = _read_json(names_path)
+            # Renormalize after the upcast to undo float16 rounding
+            self._skill_emb_norm = self._normalize(np.load(npy_path, mmap_mode='r').astype(np.float32))
+            self.skill_embeddings = self._skill_emb_norm
+            return
+        
+        embedding_data = _read_json(json_path)
+        
+        self.skill_list = embedding_data['skills']
+        
+        # Normalize once so cosine similarity is a plain matrix product
+        self._skill_emb_norm = self._normalize(np.asarray(embedding_data['embeddings'], dtype=np.float32))
+        self.skill_embeddings = self._skill_emb_norm
+        
+        try:
+            # Write to temporary files first so concurrent workers never see
+            # a partially written sidecar
+            tmp_suffix = f".{os.getpid()}.tmp"
+            with open(npy_path.with_name(npy_path.name + tmp_suffix), 'wb') as f:
+                np.save(f, self._skill_emb_norm.astype(np.float16))
+            with open(names_path.with_name(names_path.name + tmp_suffix), 'w', encoding='utf-8') as f:
+                json.dump(self.skill_list, f, ensure_ascii=False)
+            os.replace(names_path.with_name(names_path.name + tmp_suffix), names_path)
+            os.replace(npy_path.with_name(npy_path.name + tmp_suffix), npy_path)
+            logger.info(f"Wrote skill embedding cache to {npy_path}")
+        except OSError as e:
+            logger.warning(f"Could not write skill embedding cache: {e}")
+    
+    def _load_embedding_cache(self):
+        """Load previously computed resume skill embeddings from disk"""
+        if not self._emb_cache_path.exists():
+            return
+        
+        try:
+            with np.load(self._emb_cache_path) as data:
+                # Embeddings from a different model are not comparable
+                if str(data['model_name']) != self._encoder_id:
+                    return
+                keys = data['keys'].tolist()[-self.embedding_cache_size:]
+                vectors = data['vectors'][-self.embedding_cache_size:]
+                for key, vector in zip(keys, vectors):
+                    self._emb_cache[key] = vector
+            logger.info(f"Loaded {len(self._emb_cache)} cached skill embeddings")
+        except Exception as e:
+            logger.warning(f"Could not load skill embedding cache: {e}")
+    
+    def save_embedding_cache(self):
+        """Persist the resume skill embedding cache to disk"""
+        with self._emb_cache_lock:
+            keys = list(self._emb_cache.keys())
+            vectors = list(self._emb_cache.values())
+        if not keys:
+            return
+        
+        try:
+            with open(self._emb_cache_path, 'wb') as f:
+                np.savez(
+                    f,
+                    model_name=np.array(self._encoder_id),
+                    keys=np.array(keys),
+                    vectors=np.stack(vectors)
+                )
+            logger.info(f"Saved {len(keys)} skill embeddings to {self._emb_cache_path}")
+        except Exception as e:
+            logger.warning(f"Could not save skill embedding cache: {e}")
+    
+    def _encode_skills(self, skills: List[str]) -> np.ndarray:
+        """
+        Get unit-length embeddings for skill strings, only running SBERT on
+        strings that are not already cached
+        """
+        keys = [skill.strip().lower() for skill in skills]
+        
+        # The model is uncased, so lowercased keys embed the same as the originals.
+        # Hits are copied out under the lock since another thread may evict them
+        with self._emb_cache_lock:
+            found = {key: self._emb_cache[key] for key in keys if key in self._emb_cache}
+        unknown = list(dict.fromkeys(key for key in keys if key not in found))
+        if unknown:
+            # inference_mode also skips the version-counter bookkeeping no_grad keeps
+            with torch.inference_mode() if TORCH_AVAILABLE else nullcontext():
+                new_embeddings = self.sbert_model.encode(
+                    unknown,
+                    batch_size=64,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False
+                )
+            for key, vector in zip(unknown, new_embeddings):
+                found[key] = vector.astype(np.float32)
+        
+        with self._emb_cache_lock:
+            for key in keys:
+                self._emb_cache[key] = found[key]
+                self._emb_cache.move_to_end(key)
+            
+            while len(self._emb_cache) > self.embedding_cache_size:
+                self._emb_cache.popitem(last=False)
+        
+        return np.stack([found[key] for key in keys])
+    
+    @staticmethod
+    def _build_faiss_index(embeddings: np.ndarray):
+        """Build an HNSW inner-product index over the normalized skill embeddings"""
+        index = faiss.IndexHNSWFlat(embeddings.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efSearch = 64
+        index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+        logger.info(f"Built HNSW index over {index.ntotal} skill embeddings")
+        return index
+    
+    @staticmethod
+    def _quantize(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Quantize rows to int8 with a per-row max-abs scale"""
+        scales = np.abs(embeddings).max(axis=1).clip(min=1e-12) / 127.0
+        quantized = np.round(embeddings / scales[:, None]).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+    
+    @staticmethod
+    def _normalize(embeddings: np.ndarray) -> np.ndarray:
+        """L2-normalize embedding rows into a contiguous array"""
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True).clip(min=1e-12)
+        return np.ascontiguousarray(embeddings / norms)
+    
     def extract_and_match_skills(self, resume_skills: List[str]) -> List[Dict]:
         """
         Match resume skills to the master skill database using semantic similarity
@@ -85,47 +487,117 @@ class SkillGapAnalyzer:
         if not resume_skills:
             return []
         
-        matched_skills = []
-        
-        # Generate embeddings for resume skills
-        resume_embeddings = self.sbert_model.encode(resume_skills)
-        
-        # Calculate similarities
-        similarities = cosine_similarity(resume_embeddings, self.skill_embeddings)
+        return self._match_from_scores(resume_skills, *self._score_skills(resume_skills))
+    
+    def _score_skills(self, resume_skills: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find the best semantic and best fuzzy master skill for each resume skill
         
-        for i, resume_skill in enumerate(resume_skills):
-            skill_similarities = similarities[i]
-            
-            # Find best matches
-            best_match_idx = np.argmax(skill_similarities)
-            best_similarity = skill_similarities[best_match_idx]
-            
-            # Also check fuzzy matching
-            fuzzy_scores = [fuzz.ratio(resume_skill.lower(), skill.lower()) / 100.0 
-                           for skill in self.skill_list]
-            best_fuzzy_idx = np.argmax(fuzzy_scores)
-            best_fuzzy_score = fuzzy_scores[best_fuzzy_idx]
+        Args:
+            resume_skills: List of skills extracted from resume(s)
             
-            # Use the best of semantic or fuzzy matching
-            if best_similarity >= best_fuzzy_score:
-                final_match_idx = best_match_idx
-                final_score = best_similarity
-                match_type = "semantic"
-            else:
-                final_match_idx = best_fuzzy_idx
-                final_score = best_fuzzy_score
-                match_type = "fuzzy"
+        Returns:
+            Tuple of (semantic indices, semantic scores, fuzzy indices,
+            fuzzy scores), one entry per resume skill
+        """
+        # Generate unit-length embeddings for resume skills
+        resume_embeddings = self._encode_skills(resume_skills)
+        best_match_indices, best_similarities = self._semantic_top1(resume_embeddings)
+        
+        # Confident semantic matches keep the semantic result, so only the
+        # remaining rows need fuzzy scores
+        best_fuzzy_indices = np.zeros(len(resume_skills), dtype=np.intp)
+        best_fuzzy_scores = np.full(len(resume_skills), -1.0, dtype=np.float32)
+        fuzzy_rows = np.flatnonzero(best_similarities < self.fuzzy_skip_threshold)
+        
+        if len(fuzzy_rows):
+            # Also check fuzzy matching: score every remaining resume skill
+            # against every master skill in one native call
+            fuzzy_scores = process.cdist(
+                [resume_skills[i].lower() for i in fuzzy_rows],
+                self._skill_list_lower,
+                scorer=fuzz.ratio,
+                dtype=np.float32,
+                workers=-1
+            ) / 100.0
+            row_best = fuzzy_scores.argmax(axis=1)
+            best_fuzzy_indices[fuzzy_rows] = row_best
+            best_fuzzy_scores[fuzzy_rows] = fuzzy_scores[np.arange(len(fuzzy_rows)), row_best]
+        
+        return best_match_indices, best_similarities, best_fuzzy_indices, best_fuzzy_scores
+    
+    def _semantic_top1(self, resume_embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the index and cosine similarity of the closest master skill per row"""
+        if self._faiss_index is not None:
+            similarities, indices = self._faiss_index.search(
+                np.ascontiguousarray(resume_embeddings, dtype=np.float32), 1
+            )
+            return indices[:, 0], similarities[:, 0]
+        
+        # Calculate cosine similarities against the pre-normalized skill matrix
+        if self.quantized_similarity:
+            # Integer dot products accumulate in int32; rescale to cosine afterwards
+            resume_i8, resume_scales = self._quantize(resume_embeddings)
+            similarities = (resume_i8.astype(np.int32) @ self._skill_emb_i8.T).astype(np.float32)
+            similarities *= resume_scales[:, None]
+            similarities *= self._skill_scales[None, :]
+            np.clip(similarities, -1.0, 1.0, out=similarities)
+        else:
+            similarities = resume_embeddings @ self._skill_emb_norm.T
+        
+        best_match_indices = similarities.argmax(axis=1)
+        return best_match_indices, similarities[np.arange(len(similarities)), best_match_indices]
+    
+    def _match_from_scores(self,
+                           resume_skills: List[str],
+                           best_match_indices: np.ndarray,
+                           best_similarities: np.ndarray,
+                           best_fuzzy_indices: np.ndarray,
+                           best_fuzzy_scores: np.ndarray) -> List[Dict]:
+        """
+        Pick the best semantic or fuzzy match for each resume skill
+        
+        Args:
+            resume_skills: List of skills extracted from resume
+            best_match_indices: Closest master skill by embedding, per resume skill
+            best_similarities: Cosine similarity of that match
+            best_fuzzy_indices: Closest master skill by fuzzy ratio, per resume skill
+            best_fuzzy_scores: Fuzzy score of that match
             
-            if final_score >= self.similarity_threshold:
-                matched_skills.append({
-                    "original_skill": resume_skill,
-                    "matched_skill": self.skill_list[final_match_idx],
-                    "confidence": final_score,
-                    "match_type": match_type
-                })
+        Returns:
+            List of matched skills with confidence scores
+        """
+        # Use the best of semantic or fuzzy matching
+        use_semantic = best_similarities >= best_fuzzy_scores
+        final_indices = np.where(use_semantic, best_match_indices, best_fuzzy_indices)
+        final_scores = np.where(use_semantic, best_similarities, best_fuzzy_scores)
+        
+        # Plain Python numbers keep the result JSON-serializable for the database
+        matched_skills = [
+            {
+                "original_skill": resume_skills[i],
+                "matched_skill": self.skill_list[int(final_indices[i])],
+                "confidence": float(final_scores[i]),
+                "match_type": "semantic" if use_semantic[i] else "fuzzy"
+            }
+            for i in np.flatnonzero(final_scores >= self.similarity_threshold)
+        ]
         
         return matched_skills
     
+    @staticmethod
+    def _index_job_requirements(requirements: Dict[str, Any]) -> Dict[str, Any]:
+        """Precompute the requirement lists and lookup sets used by gap analysis"""
+        hot_technologies = tuple(requirements.get("hot_technologies", []))
+        in_demand_skills = tuple(requirements.get("in_demand_skills", []))
+        return {
+            "required": tuple(skill_info["skill"] for skill_info in requirements.get("skills", [])),
+            "hot_technologies": hot_technologies,
+            "in_demand_skills": in_demand_skills,
+            "hot_set": frozenset(hot_technologies),
+            "demand_set": frozenset(in_demand_skills)
+        }
+    
     def get_job_required_skills(self, job_profession: str) -> Dict[str, Any]:
         """
         Get required skills for a specific job profession
@@ -162,40 +634,62 @@ class SkillGapAnalyzer:
         """
         # Match resume skills to master database
         matched_skills = self.extract_and_match_skills(resume_skills)
-        matched_skill_names = [skill["matched_skill"] for skill in matched_skills]
-        
-        # Get required skills for target job
-        job_requirements = self.get_job_required_skills(target_job)
-        required_skills = [skill_info["skill"] for skill_info in job_requirements.get("skills", [])]
-        hot_technologies = job_requirements.get("hot_technologies", [])
-        in_demand_skills = job_requirements.get("in_demand_skills", [])
-        
-        # Calculate gaps
-        missing_skills = [skill for skill in required_skills if skill not in matched_skill_names]
-        present_skills = [skill for skill in required_skills if skill in matched_skill_names]
-        
-        # Calculate missing hot technologies and in-demand skills
-        missing_hot_tech = [skill for skill in hot_technologies if skill not in matched_skill_names]
-        missing_in_demand = [skill for skill in in_demand_skills if skill not in matched_skill_names]
+        return self._build_gap_report(matched_skills, target_job)
+    
+    def _build_gap_report(self, matched_skills: List[Dict], target_job: str) -> Dict[str, Any]:
+        """
+        Compare matched resume skills against the target job's requirements
         
-        # Calculate proficiency scores
-        total_required = len(required_skills)
-        skills_present = len(present_skills)
-        proficiency_score = (skills_present / max(total_required, 1)) * 100
+        Args:
+            matched_skills: Output of extract_and_match_skills
+            target_job: Target job profession
+            
+        Returns:
+            Detailed skill gap analysis results
+        """
+        matched_set = frozenset(skill["matched_skill"] for skill in matched_skills)
         
-        # Categorize skills by importance
+        # Get required skills for target job
+        job_index = self._job_index.get(target_job)
+        if job_index is None:
+            job_index = self._index_job_requirements(self.get_job_required_skills(target_job))
+        required_skills = job_index["required"]
+        hot_technologies = job_index["hot_technologies"]
+        in_demand_skills = job_index["in_demand_skills"]
+        hot_set = job_index["hot_set"]
+        demand_set = job_index["demand_set"]
+        
+        # Calculate gaps, categorizing missing skills by importance in the same pass
+        present_skills = []
+        missing_skills = []
         critical_missing = []
         important_missing = []
         nice_to_have_missing = []
         
-        for skill in missing_skills:
-            if skill in hot_technologies and skill in in_demand_skills:
+        for skill in required_skills:
+            if skill in matched_set:
+                present_skills.append(skill)
+                continue
+            
+            missing_skills.append(skill)
+            is_hot = skill in hot_set
+            is_in_demand = skill in demand_set
+            if is_hot and is_in_demand:
                 critical_missing.append(skill)
-            elif skill in hot_technologies or skill in in_demand_skills:
+            elif is_hot or is_in_demand:
                 important_missing.append(skill)
             else:
                 nice_to_have_missing.append(skill)
         
+        # Calculate missing hot technologies and in-demand skills
+        missing_hot_tech = [skill for skill in hot_technologies if skill not in matched_set]
+        missing_in_demand = [skill for skill in in_demand_skills if skill not in matched_set]
+        
+        # Calculate proficiency scores
+        total_required = len(required_skills)
+        skills_present = len(present_skills)
+        proficiency_score = (skills_present / max(total_required, 1)) * 100
+        
         return {
             "target_job": target_job,
             "proficiency_score": proficiency_score,
@@ -242,11 +736,11 @@ class SkillGapAnalyzer:
         if nice_to_have:
             recommendations["priority_order"].extend([
                 {"skill": skill, "priority": "Nice-to-have", "reason": "Complementary skill"} 
-                for skill in nice_to_have[:5]  # Limit to top 5
+                for skill in nice_to_have[:MAX_NICE_TO_HAVE_PRIORITIES]
             ])
         
         # Create learning path
-        all_missing = critical + important + nice_to_have[:3]
+        all_missing = critical + important + nice_to_have[:MAX_NICE_TO_HAVE_IN_PATH]
         recommendations["learning_path"] = self._create_learning_path(all_missing)
         
         return recommendations
@@ -254,26 +748,12 @@ class SkillGapAnalyzer:
     def _create_learning_path(self, skills: List[str]) -> List[Dict]:
         """Create an optimized learning path for missing skills"""
         # This is a simplified version. In production, you'd want more sophisticated logic
-        skill_categories = {
-            "programming": ["Python", "Java", "JavaScript", "C++", "R"],
-            "data_science": ["Machine Learning", "Deep Learning", "Statistics", "Data Analysis"],
-            "web": ["HTML", "CSS", "React", "Angular", "Node.js"],
-            "database": ["SQL", "MySQL", "PostgreSQL", "MongoDB"],
-            "cloud": ["AWS", "Azure", "Google Cloud", "Docker", "Kubernetes"],
-            "tools": ["Git", "Docker", "Jenkins", "Tableau"]
-        }
-        
         learning_path = []
         
         # Group skills by category for optimal learning order
         categorized_skills = {}
-        for skill in skills:
-            category = "other"
-            for cat, cat_skills in skill_categories.items():
-                if any(cat_skill.lower() in skill.lower() for cat_skill in cat_skills):
-                    category = cat
-                    break
-            
+        skill_categories = _match_categories(skills, _LEARNING_PATH_PATTERNS, _LEARNING_PATH_TABLES, "other")
+        for skill, category in zip(skills, skill_categories):
             if category not in categorized_skills:
                 categorized_skills[category] = []
             categorized_skills[category].append(skill)
@@ -320,35 +800,14 @@ class SkillGapAnalyzer:
     
     def _categorize_skills(self, present: List[str], missing: List[str]) -> Dict[str, List[str]]:
         """Categorize skills into technical areas"""
-        categories = {
-            "Programming Languages": [],
-            "Machine Learning/AI": [],
-            "Web Technologies": [],
-            "Databases": [],
-            "Cloud & DevOps": [],
-            "Data Analysis": [],
-            "Other": []
-        }
+        categories = {category: [] for category in SKILL_AREA_KEYWORDS}
+        categories["Other"] = []
         
         all_skills = present + missing
         
-        for skill in all_skills:
-            skill_lower = skill.lower()
-            
-            if any(lang in skill_lower for lang in ['python', 'java', 'javascript', 'c++', 'r', 'sql']):
-                categories["Programming Languages"].append(skill)
-            elif any(ml in skill_lower for ml in ['machine learning', 'deep learning', 'tensorflow', 'scikit', 'neural']):
-                categories["Machine Learning/AI"].append(skill)
-            elif any(web in skill_lower for web in ['html', 'css', 'react', 'angular', 'node', 'express']):
-                categories["Web Technologies"].append(skill)
-            elif any(db in skill_lower for db in ['mysql', 'postgresql', 'mongodb', 'database', 'sql']):
-                categories["Databases"].append(skill)
-            elif any(cloud in skill_lower for cloud in ['aws', 'azure', 'cloud', 'docker', 'kubernetes']):
-                categories["Cloud & DevOps"].append(skill)
-            elif any(data in skill_lower for data in ['tableau', 'power bi', 'excel', 'analytics', 'statistics']):
-                categories["Data Analysis"].append(skill)
-            else:
-                categories["Other"].append(skill)
+        skill_areas = _match_categories(all_skills, _SKILL_AREA_PATTERNS, _SKILL_AREA_TABLES, "Other")
+        for skill, area in zip(all_skills, skill_areas):
+            categories[area].append(skill)
         
         # Remove empty categories
         return {k: v for k, v in categories.items() if v}
@@ -366,56 +825,35 @@ class SkillGapAnalyzer:
         visualizations = {}
         
         # 1. Proficiency Score Gauge
-        fig_gauge = go.Figure(go.Indicator(
-            mode = "gauge+number+delta",
-            value = analysis_result["proficiency_score"],
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': "Skill Proficiency Score"},
-            delta = {'reference': 80},
-            gauge = {
-                'axis': {'range': [None, 100]},
-                'bar': {'color': "darkblue"},
-                'steps': [
-                    {'range': [0, 50], 'color': "lightgray"},
-                    {'range': [50, 80], 'color': "yellow"},
-                    {'range': [80, 100], 'color': "green"}],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 90}}))
-        
-        visualizations["proficiency_gauge"] = fig_gauge.to_json()
+        gauge = dict(_GAUGE_LAYOUT, value=analysis_result["proficiency_score"])
+        visualizations["proficiency_gauge"] = _figure_to_json([gauge], {})
         
         # 2. Skill Gap Bar Chart
-        categories = ["Present Skills", "Critical Missing", "Important Missing", "Nice-to-have Missing"]
         values = [
             len(analysis_result["present_skills"]),
             len(analysis_result["critical_missing"]),
             len(analysis_result["important_missing"]),
             len(analysis_result["nice_to_have_missing"])
         ]
-        colors = ["green", "red", "orange", "lightblue"]
-        
-        fig_bar = go.Figure(data=[
-            go.Bar(x=categories, y=values, marker_color=colors)
-        ])
-        fig_bar.update_layout(
-            title="Skill Gap Analysis",
-            xaxis_title="Skill Categories",
-            yaxis_title="Number of Skills"
-        )
         
-        visualizations["skill_gap_bar"] = fig_bar.to_json()
+        visualizations["skill_gap_bar"] = _figure_to_json(
+            [{'type': 'bar', 'x': _GAP_BAR_CATEGORIES, 'y': values, 'marker': {'color': _GAP_BAR_COLORS}}],
+            {
+                'title': {'text': "Skill Gap Analysis"},
+                'xaxis': {'title': {'text': "Skill Categories"}},
+                'yaxis': {'title': {'text': "Number of Skills"}}
+            }
+        )
         
         # 3. Skill Category Breakdown
         if analysis_result["skill_categories"]:
             categories = list(analysis_result["skill_categories"].keys())
             values = [len(skills) for skills in analysis_result["skill_categories"].values()]
             
-            fig_pie = go.Figure(data=[go.Pie(labels=categories, values=values)])
-            fig_pie.update_layout(title="Skills by Technical Category")
-            
-            visualizations["category_pie"] = fig_pie.to_json()
+            visualizations["category_pie"] = _figure_to_json(
+                [{'type': 'pie', 'labels': categories, 'values': values}],
+                {'title': {'text': "Skills by Technical Category"}}
+            )
         
         # 4. Learning Path Timeline
         if analysis_result["recommendations"]["learning_path"]:
@@ -423,24 +861,23 @@ class SkillGapAnalyzer:
             weeks = [item["estimated_weeks"] for item in analysis_result["recommendations"]["learning_path"]]
             
             # Calculate cumulative timeline
-            cumulative_weeks = np.cumsum(weeks)
+            cumulative_weeks = np.cumsum(weeks).tolist()
             
-            fig_timeline = go.Figure()
-            fig_timeline.add_trace(go.Scatter(
-                x=cumulative_weeks,
-                y=skills,
-                mode='markers+lines',
-                marker=dict(size=10, color='blue'),
-                name='Learning Timeline'
-            ))
-            
-            fig_timeline.update_layout(
-                title="Recommended Learning Path Timeline",
-                xaxis_title="Weeks",
-                yaxis_title="Skills to Learn"
+            visualizations["learning_timeline"] = _figure_to_json(
+                [{
+                    'type': 'scatter',
+                    'x': cumulative_weeks,
+                    'y': skills,
+                    'mode': 'markers+lines',
+                    'marker': {'size': 10, 'color': 'blue'},
+                    'name': 'Learning Timeline'
+                }],
+                {
+                    'title': {'text': "Recommended Learning Path Timeline"},
+                    'xaxis': {'title': {'text': "Weeks"}},
+                    'yaxis': {'title': {'text': "Skills to Learn"}}
+                }
             )
-            
-            visualizations["learning_timeline"] = fig_timeline.to_json()
         
         return visualizations
     
@@ -459,12 +896,32 @@ class SkillGapAnalyzer:
         Returns:
             List of analysis results
         """
-        results = []
-        for skills in skill_lists:
-            result = self.analyze_skill_gap(skills, target_job)
-            results.append(result)
-        
-        return results
+        # Score every resume's skills in a single encode/GEMM/cdist pass,
+        # then slice the score matrices back out per resume
+        flat_skills = [skill for skills in skill_lists for skill in skills]
+        offsets = np.cumsum([0] + [len(skills) for skills in skill_lists])
+        
+        if flat_skills:
+            scores = self._score_skills(flat_skills)
+        
+        def analyze_one(i: int) -> Dict[str, Any]:
+            start, end = offsets[i], offsets[i + 1]
+            if start == end:
+                matched_skills = []
+            else:
+                matched_skills = self._match_from_scores(
+                    skill_lists[i], *(score[start:end] for score in scores)
+                )
+            return self._build_gap_report(matched_skills, target_job)
+        
+        if len(skill_lists) < 2:
+            return [analyze_one(i) for i in range(len(skill_lists))]
+        
+        # Post-encode work is independent per resume; NumPy releases the GIL
+        # for the selection step
+        max_workers = min(len(skill_lists), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(analyze_one, range(len(skill_lists))))
 
 # Utility functions for integration with other components
 def load_skills_from_resume_text(resume_text: str, skill_extractor) -> List[str]:
@@ -479,7 +936,7 @@ def load_skills_from_resume_text(resume_text: str, skill_extractor) -> List[str]
         List of extracted skill names
     """
     extracted_skills = skill_extractor.extract_skills(resume_text)
-    return [skill["text"] for skill in extracted_skills]
+    return [skill.text for skill in extracted_skills]
 
 def generate_course_recommendations(missing_skills: List[str], api_client) -> List[Dict]:
     """
@@ -519,6 +976,7 @@ if __name__ == "__main__":
     target_job = "Data Science"
     
     result = analyzer.analyze_skill_gap(resume_skills, target_job)
+    json.dumps(result)  # Must stay serializable for save_skill_analysis
     visualizations = analyzer.create_skill_gap_visualization(result)
     
     print(f"Proficiency Score: {result['proficiency_score']:.1f}%")
@@ -1,17 +1,49 @@
 import json
+import os
 import random
+import subprocess
+import sys
+import numpy as np
 import spacy
+from spacy.tokens import DocBin
 from spacy.training import Example
-from spacy.util import minibatch, compounding
+from spacy.util import minibatch, compounding, filter_spans
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Tuple, Optional, NamedTuple
 import warnings
 warnings.filterwarnings("ignore")
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Pipeline components skill extraction never reads; only NER (and the
+# tok2vec it listens to) is needed at inference
+NON_NER_PIPES = ['tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'textcat', 'senter']
+
+# Intermediate checkpoints are written every CHECKPOINT_EVERY iterations, and
+# only when the NER loss dropped by at least 2% since the last one
+CHECKPOINT_EVERY = 20
+CHECKPOINT_MIN_IMPROVEMENT = 0.98
+
+# Share of training docs held out as the dev corpus for `spacy train`
+CLI_DEV_FRACTION = 0.1
+
+# Rough number of characters per nlp.pipe batch when batch_size is not given
+TARGET_BATCH_CHARS = 100_000
+
+# Number of distinct texts whose extracted skills are kept in memory
+EXTRACTION_CACHE_SIZE = 10_000
+
+class Skill(NamedTuple):
+    """A SKILL entity found in a text"""
+    text: str
+    start: int
+    end: int
+    label: str
+    confidence: float
+
 class SkillExtractionTrainer:
     def __init__(self, training_data_path: str, model_output_path: str):
         """
@@ -24,28 +56,39 @@ class SkillExtractionTrainer:
         self.training_data_path = training_data_path
         self.model_output_path = model_output_path
         self.training_data = []
+        self.training_docs = []
+        self.examples = []
         self.nlp = None
         
     def load_training_data(self):
-        """Load training data from JSON file"""
+        """
+        Load training data from JSON file
+        
+        Tokenized docs, with their validated entities in user_data, are cached
+        in a DocBin next to the JSON. Later runs read the DocBin instead of
+        parsing the JSON and tokenizing again, as long as it is newer.
+        """
+        json_path = Path(self.training_data_path)
+        cache_path = json_path.with_suffix('.spacy')
+        nlp = self.nlp if self.nlp is not None else spacy.blank("en")
+        
         try:
-            with open(self.training_data_path, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
+            if cache_path.exists() and cache_path.stat().st_mtime >= json_path.stat().st_mtime:
+                doc_bin = DocBin(store_user_data=True).from_disk(cache_path)
+                self.training_docs = list(doc_bin.get_docs(nlp.vocab))
+                logger.info(f"Loaded tokenized training data from {cache_path}")
+            else:
+                self.training_docs = self._build_training_docs(nlp)
+                try:
+                    DocBin(docs=self.training_docs, store_user_data=True).to_disk(cache_path)
+                except OSError as e:
+                    logger.warning(f"Could not write training data cache: {e}")
             
             # Convert to spaCy format: (text, {"entities": [(start, end, label)]})
-            self.training_data = []
-            for item in raw_data:
-                text = item['text']
-                entities = item['entities']
-                
-                # Validate entities
-                validated_entities = []
-                for start, end, label in entities:
-                    if start < end <= len(text):
-                        validated_entities.append((start, end, label))
-                
-                if validated_entities:
-                    self.training_data.append((text, {"entities": validated_entities}))
+            self.training_data = [
+                (doc.text, {"entities": [tuple(entity) for entity in doc.user_data["entities"]]})
+                for doc in self.training_docs
+            ]
             
             logger.info(f"Loaded {len(self.training_data)} training examples")
             
@@ -53,8 +96,45 @@ class SkillExtractionTrainer:
             logger.error(f"Error loading training data: {e}")
             raise
     
-    def create_model(self, model_name: str = None) -> spacy.Language:
-        """Create a new spaCy model or load existing one"""
+    def _build_training_docs(self, nlp: spacy.Language) -> List:
+        """Parse the training JSON and tokenize texts that have valid entities"""
+        with open(self.training_data_path, 'r', encoding='utf-8') as f:
+            raw_data = json.load(f)
+        
+        # Validate every entity in the dataset with one vectorized comparison
+        entity_counts = np.fromiter((len(item['entities']) for item in raw_data), dtype=np.int64, count=len(raw_data))
+        flat_entities = [tuple(entity) for item in raw_data for entity in item['entities']]
+        bounds = np.array([entity[:2] for entity in flat_entities], dtype=np.int64).reshape(-1, 2)
+        text_lengths = np.repeat([len(item['text']) for item in raw_data], entity_counts)
+        valid = (bounds[:, 0] < bounds[:, 1]) & (bounds[:, 1] <= text_lengths)
+        offsets = np.concatenate(([0], np.cumsum(entity_counts)))
+        
+        docs = []
+        for i, item in enumerate(raw_data):
+            text = item['text']
+            start, end = offsets[i], offsets[i + 1]
+            validated_entities = [
+                flat_entities[j] for j in range(start, end) if valid[j]
+            ]
+            
+            if validated_entities:
+                doc = nlp.make_doc(text)
+                doc.user_data["entities"] = validated_entities
+                docs.append(doc)
+        
+        return docs
+    
+    def create_model(self, model_name: str = None, gpu_id: int = 0) -> spacy.Language:
+        """
+        Create a new spaCy model or load existing one
+        
+        Args:
+            model_name: Existing model to continue training from
+            gpu_id: GPU to allocate the model on if one is available, or -1 for CPU
+        """
+        if gpu_id >= 0 and spacy.prefer_gpu(gpu_id):
+            logger.info(f"Training on GPU {gpu_id}")
+        
         if model_name and Path(model_name).exists():
             logger.info(f"Loading existing model: {model_name}")
             nlp = spacy.load(model_name)
@@ -77,7 +157,8 @@ class SkillExtractionTrainer:
                    n_iter: int = 100, 
                    dropout: float = 0.2,
                    batch_size: int = 4,
-                   learn_rate: float = 0.001):
+                   learn_rate: float = 0.001,
+                   gpu_id: int = 0):
         """
         Train the spaCy NER model
         
@@ -86,66 +167,171 @@ class SkillExtractionTrainer:
             dropout: Dropout rate for regularization
             batch_size: Batch size for training
             learn_rate: Learning rate
+            gpu_id: GPU to train on if one is available, or -1 for CPU
         """
+        # Create model
+        self.nlp = self.create_model(gpu_id=gpu_id)
+        
         # Load training data
         self.load_training_data()
         
-        # Create model
-        self.nlp = self.create_model()
-        
         # Get the NER component
         ner = self.nlp.get_pipe("ner")
         
+        # Build examples from the already tokenized docs once; epochs only
+        # reshuffle them
+        self.examples = [
+            Example.from_dict(doc, annotations)
+            for doc, (_, annotations) in zip(self.training_docs, self.training_data)
+        ]
+        
         # Only train NER
         pipe_exceptions = ["ner", "trf_wordpiecer", "trf_tok2vec"]
         other_pipes = [pipe for pipe in self.nlp.pipe_names if pipe not in pipe_exceptions]
         
         # Disable other components during training
         with self.nlp.disable_pipes(*other_pipes):
-            # Initialize optimizer
-            optimizer = self.nlp.resume_training()
+            # Initialize optimizer; the pipeline is blank, so its weights and
+            # NER transitions are initialized from the examples
+            optimizer = self.nlp.initialize(get_examples=lambda: self.examples)
             optimizer.learn_rate = learn_rate
             
             logger.info(f"Starting training for {n_iter} iterations...")
             
+            examples = tuple(self.examples)
+            rng = np.random.default_rng()
+            best_loss = float("inf")
+            
             for iteration in range(n_iter):
                 logger.info(f"Iteration {iteration + 1}/{n_iter}")
                 
-                # Shuffle training data
-                random.shuffle(self.training_data)
+                # Shuffle training examples by permuting indices in C
+                order = rng.permutation(len(examples))
                 losses = {}
                 
                 # Create batches
-                batches = minibatch(self.training_data, size=compounding(4.0, 32.0, 1.001))
+                batches = minibatch((examples[i] for i in order), size=compounding(4.0, 32.0, 1.001))
                 
                 for batch in batches:
-                    examples = []
-                    for text, annotations in batch:
-                        doc = self.nlp.make_doc(text)
-                        example = Example.from_dict(doc, annotations)
-                        examples.append(example)
-                    
                     # Update model
-                    self.nlp.update(examples, drop=dropout, losses=losses, sgd=optimizer)
+                    self.nlp.update(batch, drop=dropout, losses=losses, sgd=optimizer)
                 
                 logger.info(f"Losses: {losses}")
                 
-                # Save intermediate model every 20 iterations
-                if (iteration + 1) % 20 == 0:
-                    temp_path = f"{self.model_output_path}_iter_{iteration + 1}"
-                    self.save_model(temp_path)
-                    
-                    # Evaluate model
-                    self.evaluate_model()
+                # Checkpoint periodically, but only while the loss still improves
+                if (iteration + 1) % CHECKPOINT_EVERY == 0:
+                    loss = losses.get("ner", 0.0)
+                    if loss < best_loss * CHECKPOINT_MIN_IMPROVEMENT:
+                        best_loss = loss
+                        self._save_checkpoint(iteration + 1)
+                        
+                        # Evaluate model
+                        self.evaluate_model()
+                    else:
+                        logger.info(f"Loss plateaued at {loss:.3f}, skipping checkpoint")
         
         logger.info("Training completed!")
     
+    def _save_checkpoint(self, iteration: int):
+        """
+        Write the NER component's weights for an intermediate iteration
+        
+        Only the component bytes are written; save_model writes the full
+        pipeline once training is done. Restore a checkpoint with
+        nlp.get_pipe("ner").from_bytes(...) on a pipeline built by create_model.
+        """
+        checkpoint_dir = Path(f"{self.model_output_path}_checkpoints")
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        
+        checkpoint_path = checkpoint_dir / f"ner_iter_{iteration}.bin"
+        checkpoint_path.write_bytes(self.nlp.get_pipe("ner").to_bytes())
+        logger.info(f"Checkpoint saved to: {checkpoint_path}")
+    
+    def train_model_cli(self,
+                        n_iter: int = 100,
+                        dropout: float = 0.2,
+                        learn_rate: float = 0.001,
+                        gpu_id: int = -1):
+        """
+        Train the NER model with the `spacy train` CLI instead of the Python loop
+        
+        The training docs are written as DocBin corpora next to the model
+        output together with a generated tok2vec + ner config, and training
+        runs in a `spacy train` subprocess. The final weights are loaded into
+        self.nlp, so save_model/evaluate_model work as after train_model.
+        
+        Args:
+            n_iter: Number of training epochs
+            dropout: Dropout rate for regularization
+            learn_rate: Learning rate
+            gpu_id: GPU to train on, or -1 for CPU
+        """
+        # Only the CLI training path needs the config generator
+        from spacy.cli.init_config import init_config
+        
+        self.nlp = spacy.blank("en")
+        self.load_training_data()
+        
+        output_dir = Path(self.model_output_path)
+        training_dir = output_dir.with_name(f"{output_dir.name}_training")
+        train_path, dev_path = self._write_cli_corpora(training_dir)
+        
+        config = init_config(lang="en", pipeline=["ner"], optimize="efficiency", gpu=gpu_id >= 0)
+        config["training"]["max_epochs"] = n_iter
+        config["training"]["max_steps"] = 0
+        config["training"]["dropout"] = dropout
+        config["training"]["optimizer"]["learn_rate"] = learn_rate
+        config_path = training_dir / "config.cfg"
+        config.to_disk(config_path)
+        
+        logger.info(f"Starting spacy train for {n_iter} epochs in {training_dir}...")
+        subprocess.run(
+            [
+                sys.executable, "-m", "spacy", "train", str(config_path),
+                "--output", str(training_dir),
+                "--gpu-id", str(gpu_id),
+                "--paths.train", str(train_path),
+                "--paths.dev", str(dev_path),
+            ],
+            check=True
+        )
+        
+        self.nlp = spacy.load(training_dir / "model-last")
+        logger.info("Training completed!")
+    
+    def _write_cli_corpora(self, training_dir: Path) -> Tuple[Path, Path]:
+        """Write the training docs, with entities set, as train/dev DocBins"""
+        docs = []
+        for doc in self.training_docs:
+            spans = [
+                doc.char_span(start, end, label=label, alignment_mode="contract")
+                for start, end, label in doc.user_data["entities"]
+            ]
+            doc.ents = filter_spans([span for span in spans if span is not None])
+            docs.append(doc)
+        
+        order = np.random.default_rng().permutation(len(docs))
+        n_dev = max(1, int(len(docs) * CLI_DEV_FRACTION))
+        dev_docs = [docs[i] for i in order[:n_dev]]
+        train_docs = [docs[i] for i in order[n_dev:]] or dev_docs
+        
+        training_dir.mkdir(parents=True, exist_ok=True)
+        train_path = training_dir / "train.spacy"
+        dev_path = training_dir / "dev.spacy"
+        DocBin(docs=train_docs).to_disk(train_path)
+        DocBin(docs=dev_docs).to_disk(dev_path)
+        
+        return train_path, dev_path
+    
     def evaluate_model(self, test_data: List[Tuple] = None):
         """
         Evaluate the trained model
         
         Args:
             test_data: Test data in spaCy format. If None, uses training data sample
+            
+        Returns:
+            Recall of exact entity matches (the score previously logged as precision)
         """
         if test_data is None:
             # Use a sample of training data for evaluation
@@ -153,25 +339,30 @@ class SkillExtractionTrainer:
         
         correct = 0
         total = 0
+        predicted_total = 0
         
         logger.info("Evaluating model...")
         
-        for text, annotations in test_data:
-            doc = self.nlp(text)
-            predicted_entities = [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents]
-            actual_entities = annotations["entities"]
+        texts = [text for text, _ in test_data]
+        docs = self.nlp.pipe(texts, batch_size=64)
+        
+        for doc, (_, annotations) in zip(docs, test_data):
+            predicted_entities = {(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents}
+            actual_entities = {tuple(entity) for entity in annotations["entities"]}
             
             # Simple evaluation: count exact matches
-            for pred in predicted_entities:
-                if pred in actual_entities:
-                    correct += 1
-            
+            correct += len(predicted_entities & actual_entities)
             total += len(actual_entities)
+            predicted_total += len(predicted_entities)
         
-        precision = correct / max(total, 1)
-        logger.info(f"Evaluation - Precision: {precision:.3f} ({correct}/{total})")
+        recall = correct / max(total, 1)
+        precision = correct / max(predicted_total, 1)
+        logger.info(
+            f"Evaluation - Precision: {precision:.3f} ({correct}/{predicted_total}), "
+            f"Recall: {recall:.3f} ({correct}/{total})"
+        )
         
-        return precision
+        return recall
     
     def save_model(self, output_path: str = None):
         """
@@ -234,28 +425,47 @@ class SkillExtractor:
     Production-ready skill extractor using trained spaCy model
     """
     
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: str, batch_size: Optional[int] = None, n_process: int = 1,
+                 gpu_id: int = -1):
         """
         Initialize skill extractor with trained model
         
         Args:
             model_path: Path to the trained spaCy model
+            batch_size: Texts per nlp.pipe batch. If None, picked from the average text length
+            n_process: Worker processes for batch extraction; -1 uses all cores but one.
+                Process start-up only pays off for large batches (roughly 500+ texts)
+            gpu_id: GPU to run the model on if one is available; -1 (default) keeps it on CPU
         """
         self.model_path = model_path
+        self.gpu_id = gpu_id
+        self.batch_size = batch_size
+        self.n_process = max(1, (os.cpu_count() or 2) - 1) if n_process == -1 else n_process
         self.nlp = None
+        
+        # Resumes and job descriptions repeat a lot across users, so identical
+        # texts are only run through the model once
+        self._extract_cached = lru_cache(maxsize=EXTRACTION_CACHE_SIZE)(self._extract_entities)
+        
         self.load_model()
     
     def load_model(self):
         """Load the trained spaCy model"""
+        if self.gpu_id >= 0 and spacy.prefer_gpu(self.gpu_id):
+            logger.info(f"Running skill extraction on GPU {self.gpu_id}")
+        
         try:
-            self.nlp = spacy.load(self.model_path)
-            logger.info(f"Loaded model from: {self.model_path}")
+            # Excluded components are never constructed, so their weights stay off the heap
+            self.nlp = spacy.load(self.model_path, exclude=NON_NER_PIPES)
+            logger.info(f"Loaded model from: {self.model_path} (pipes: {self.nlp.pipe_names})")
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             logger.info("Falling back to blank English model")
             self.nlp = spacy.blank("en")
+        
+        self._extract_cached.cache_clear()
     
-    def extract_skills(self, text: str) -> List[Dict]:
+    def extract_skills(self, text: str) -> List[Skill]:
         """
         Extract skills from text
         
@@ -268,22 +478,23 @@ class SkillExtractor:
         if not text or not text.strip():
             return []
         
-        doc = self.nlp(text)
-        
-        skills = []
-        for ent in doc.ents:
-            if ent.label_ == "SKILL":
-                skills.append({
-                    "text": ent.text,
-                    "start": ent.start_char,
-                    "end": ent.end_char,
-                    "label": ent.label_,
-                    "confidence": getattr(ent._, 'confidence', 1.0)
-                })
-        
-        return skills
+        # Skills are immutable, so the cached tuple can be shared
+        return list(self._extract_cached(text))
     
-    def extract_skills_batch(self, texts: List[str]) -> List[List[Dict]]:
+    def _extract_entities(self, text: str) -> Tuple[Skill, ...]:
+        """Run the model on one text, as an immutable tuple for caching"""
+        return tuple(self._doc_skills(self.nlp(text)))
+    
+    @staticmethod
+    def _doc_skills(doc) -> List[Skill]:
+        """Collect SKILL entities from a processed doc"""
+        return [
+            Skill(ent.text, ent.start_char, ent.end_char, ent.label_, getattr(ent._, 'confidence', 1.0))
+            for ent in doc.ents
+            if ent.label_ == "SKILL"
+        ]
+    
+    def extract_skills_batch(self, texts: List[str]) -> List[List[Skill]]:
         """
         Extract skills from multiple texts in batch
         
@@ -293,22 +504,21 @@ class SkillExtractor:
         Returns:
             List of skill lists for each input text
         """
-        results = []
-        
-        for doc in self.nlp.pipe(texts):
-            skills = []
-            for ent in doc.ents:
-                if ent.label_ == "SKILL":
-                    skills.append({
-                        "text": ent.text,
-                        "start": ent.start_char,
-                        "end": ent.end_char,
-                        "label": ent.label_,
-                        "confidence": getattr(ent._, 'confidence', 1.0)
-                    })
-            results.append(skills)
-        
-        return results
+        if not texts:
+            return []
+        
+        batch_size = self.batch_size
+        if batch_size is None:
+            # Short texts batch well; long resumes need smaller batches to bound memory
+            avg_chars = sum(len(text) for text in texts) / len(texts)
+            batch_size = int(max(8, min(1000, TARGET_BATCH_CHARS // max(avg_chars, 1))))
+        
+        docs = self.nlp.pipe(
+            texts,
+            batch_size=batch_size,
+            n_process=self.n_process
+        )
+        return [self._doc_skills(doc) for doc in docs]
 
 if __name__ == "__main__":
     # Example usage
@@ -2,24 +2,67 @@
 Authentication utilities for JWT token management and password hashing
 """
 
+import base64
+import calendar
+import hashlib
+import hmac
+import json
+import re
+import secrets
+import string
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-import jwt
-from passlib.context import CryptContext
+import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError, VerificationError, InvalidHashError
+# python-jose with the cryptography extra signs HS256 through OpenSSL's HMAC,
+# which uses SHA-NI where the CPU has it
+from jose import jwt, JWTError, ExpiredSignatureError
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import logging
 from config import Config
-from .database import get_user_by_id, get_user_by_email
+from .database import get_user_by_id, get_user_by_email, update_user_password_hash
 
 logger = logging.getLogger(__name__)
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt only uses the first 72 bytes of a password
+BCRYPT_MAX_PASSWORD_BYTES = 72
+BCRYPT_HASH_PREFIXES = ('$2a$', '$2b$', '$2y$')
+
+# New passwords are hashed with Argon2id; legacy bcrypt hashes are still
+# accepted and upgraded on the next successful login
+password_hasher = PasswordHasher(
+    time_cost=Config.ARGON2_TIME_COST,
+    memory_cost=Config.ARGON2_MEMORY_COST,
+    parallelism=Config.ARGON2_PARALLELISM
+)
+
+# Verified against when the email is unknown, so a failed login costs the
+# same whether or not the user exists
+_DUMMY_PASSWORD_HASH = password_hasher.hash(secrets.token_urlsafe(16))
 
 # JWT token security
 security = HTTPBearer()
 
+# Character classes for password strength checks
+_UPPER = frozenset(string.ascii_uppercase)
+_LOWER = frozenset(string.ascii_lowercase)
+_DIGITS = frozenset(string.digits)
+
+# Resolved users are cached per token for a short time, so repeated requests
+# skip the JWT decode and the database lookup
+TOKEN_CACHE_TTL_SECONDS = 30
+TOKEN_CACHE_MAX_SIZE = 10000
+
+# Pre-encoded JOSE header for HS256 tokens: {"alg":"HS256","typ":"JWT"}
+_HS256_HEADER_B64 = b'eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9'
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 class AuthManager:
     """Authentication and authorization manager"""
     
@@ -27,18 +70,41 @@ class AuthManager:
         self.secret_key = Config.JWT_SECRET_KEY
         self.algorithm = "HS256"
         self.access_token_expire_minutes = Config.JWT_ACCESS_TOKEN_EXPIRES // 60
+        
+        # Keyed HMAC state, copied per token instead of re-deriving the key pads
+        self._hmac_proto = hmac.new(self.secret_key.encode('utf-8'), digestmod=hashlib.sha256)
+        
+        # token digest -> (monotonic expiry, user)
+        self._token_cache = OrderedDict()
+        self._token_cache_lock = threading.Lock()
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash"""
+        """Verify a password against its Argon2id or legacy bcrypt hash"""
         try:
-            return pwd_context.verify(plain_password, hashed_password)
-        except Exception as e:
+            if hashed_password.startswith(BCRYPT_HASH_PREFIXES):
+                return bcrypt.checkpw(
+                    plain_password.encode('utf-8')[:BCRYPT_MAX_PASSWORD_BYTES],
+                    hashed_password.encode('utf-8')
+                )
+            return password_hasher.verify(hashed_password, plain_password)
+        except VerifyMismatchError:
+            return False
+        except (VerificationError, InvalidHashError, ValueError) as e:
             logger.error(f"Error verifying password: {e}")
             return False
     
     def get_password_hash(self, password: str) -> str:
-        """Hash a password"""
-        return pwd_context.hash(password)
+        """Hash a password with Argon2id"""
+        return password_hasher.hash(password)
+    
+    def password_needs_rehash(self, hashed_password: str) -> bool:
+        """Check whether a stored hash is bcrypt or uses outdated Argon2 parameters"""
+        if hashed_password.startswith(BCRYPT_HASH_PREFIXES):
+            return True
+        try:
+            return password_hasher.check_needs_rehash(hashed_password)
+        except InvalidHashError:
+            return True
     
     def create_access_token(self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
         """Create a JWT access token"""
@@ -49,11 +115,10 @@ class AuthManager:
         else:
             expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
         
-        to_encode.update({"exp": expire})
+        to_encode.update({"exp": calendar.timegm(expire.utctimetuple())})
         
         try:
-            encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
-            return encoded_jwt
+            return self._encode_hs256(to_encode)
         except Exception as e:
             logger.error(f"Error creating access token: {e}")
             raise HTTPException(
@@ -61,17 +126,30 @@ class AuthManager:
                 detail="Could not create access token"
             )
     
+    def _encode_hs256(self, claims: Dict[str, Any]) -> str:
+        """Sign claims as a compact HS256 JWT using the pre-keyed HMAC"""
+        payload_b64 = base64.urlsafe_b64encode(
+            json.dumps(claims, separators=(',', ':')).encode('utf-8')
+        ).rstrip(b'=')
+        signing_input = _HS256_HEADER_B64 + b'.' + payload_b64
+        
+        mac = self._hmac_proto.copy()
+        mac.update(signing_input)
+        signature_b64 = base64.urlsafe_b64encode(mac.digest()).rstrip(b'=')
+        
+        return (signing_input + b'.' + signature_b64).decode('ascii')
+    
     def verify_token(self, token: str) -> Dict[str, Any]:
         """Verify and decode a JWT token"""
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
             return payload
-        except jwt.ExpiredSignatureError:
+        except ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has expired"
             )
-        except jwt.JWTError as e:
+        except JWTError as e:
             logger.error(f"JWT error: {e}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -83,6 +161,7 @@ class AuthManager:
         try:
             user = get_user_by_email(email)
             if not user:
+                self.verify_password(password, _DUMMY_PASSWORD_HASH)
                 logger.warning(f"Authentication failed: User not found for email {email}")
                 return None
             
@@ -90,6 +169,9 @@ class AuthManager:
                 logger.warning(f"Authentication failed: Invalid password for email {email}")
                 return None
             
+            if self.password_needs_rehash(user['password_hash']):
+                self._upgrade_password_hash(user, password)
+            
             logger.info(f"User authenticated successfully: {email}")
             return user
             
@@ -97,11 +179,24 @@ class AuthManager:
             logger.error(f"Error during authentication: {e}")
             return None
     
-    def get_current_user(self, credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
-        """Get current authenticated user from JWT token"""
+    def _upgrade_password_hash(self, user: Dict[str, Any], password: str):
+        """Re-hash a verified password with the current Argon2id parameters"""
         try:
-            # Extract token from credentials
-            token = credentials.credentials
+            new_hash = self.get_password_hash(password)
+            update_user_password_hash(user['id'], new_hash)
+            user['password_hash'] = new_hash
+            logger.info(f"Upgraded password hash for user {user['id']}")
+        except Exception as e:
+            # The login itself already succeeded; retry the upgrade next time
+            logger.error(f"Error upgrading password hash: {e}")
+    
+    def get_user_from_token(self, token: str) -> Dict[str, Any]:
+        """Resolve the authenticated user for a JWT token"""
+        try:
+            cache_key = hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
+            cached_user = self._get_cached_user(cache_key)
+            if cached_user is not None:
+                return cached_user
             
             # Verify token and get payload
             payload = self.verify_token(token)
@@ -122,7 +217,8 @@ class AuthManager:
                     detail="User not found"
                 )
             
-            return user
+            self._cache_user(cache_key, payload, user)
+            return dict(user)
             
         except HTTPException:
             raise
@@ -133,13 +229,44 @@ class AuthManager:
                 detail="Could not validate credentials"
             )
 
+    def _get_cached_user(self, cache_key: bytes) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached user for a token digest, if still fresh"""
+        with self._token_cache_lock:
+            entry = self._token_cache.get(cache_key)
+            if entry is None:
+                return None
+            
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._token_cache[cache_key]
+                return None
+            
+            self._token_cache.move_to_end(cache_key)
+            return dict(user)
+    
+    def _cache_user(self, cache_key: bytes, payload: Dict[str, Any], user: Dict[str, Any]):
+        """Cache a resolved user until the TTL or the token's own expiry, whichever is first"""
+        ttl = TOKEN_CACHE_TTL_SECONDS
+        if "exp" in payload:
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl <= 0:
+            return
+        
+        with self._token_cache_lock:
+            self._token_cache[cache_key] = (time.monotonic() + ttl, dict(user))
+            self._token_cache.move_to_end(cache_key)
+            while len(self._token_cache) > TOKEN_CACHE_MAX_SIZE:
+                self._token_cache.popitem(last=False)
+
 # Global auth manager instance
 auth_manager = AuthManager()
 
 # Dependency functions for FastAPI
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
+# Plain def: FastAPI runs it in its threadpool, so the blocking user lookup
+# stays off the event loop without an extra async wrapper
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     """FastAPI dependency to get current authenticated user"""
-    return auth_manager.get_current_user(credentials)
+    return auth_manager.get_user_from_token(credentials.credentials)
 
 async def get_current_active_user(current_user: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
     """FastAPI dependency to get current active user"""
@@ -175,9 +302,18 @@ def validate_password(password: str) -> Dict[str, Any]:
     if len(password) < 8:
         return {"valid": False, "message": "Password must be at least 8 characters long"}
     
-    has_upper = any(c.isupper() for c in password)
-    has_lower = any(c.islower() for c in password)
-    has_digit = any(c.isdigit() for c in password)
+    # Classify the distinct characters with C-level set operations
+    chars = set(password)
+    has_upper = not _UPPER.isdisjoint(chars)
+    has_lower = not _LOWER.isdisjoint(chars)
+    has_digit = not _DIGITS.isdisjoint(chars)
+    
+    # Non-ASCII letters and digits still count, as with str.isupper() etc.
+    if not password.isascii():
+        non_ascii = [c for c in chars if not c.isascii()]
+        has_upper = has_upper or any(c.isupper() for c in non_ascii)
+        has_lower = has_lower or any(c.islower() for c in non_ascii)
+        has_digit = has_digit or any(c.isdigit() for c in non_ascii)
     
     if not has_upper:
         return {"valid": False, "message": "Password must contain at least one uppercase letter"}
@@ -193,6 +329,4 @@ def validate_password(password: str) -> Dict[str, Any]:
 # Email validation
 def validate_email(email: str) -> bool:
     """Simple email validation"""
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
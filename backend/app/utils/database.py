@@ -2,51 +2,103 @@
 Database connection utilities and helper functions
 """
 
+import json
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
 from contextlib import contextmanager
 import logging
+import threading
+import time
+import uuid
+import weakref
+from types import MappingProxyType
 from typing import Dict, Any, List, Optional, Generator
 import os
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Connections kept open for reuse; mysql-connector caps a pool at 32
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '16'))
+
+# Rows pulled from a stored procedure result set per fetchmany call
+STORED_RESULT_FETCH_SIZE = 1024
+
+# Trending skills come from an aggregating view over skill_trends, which only
+# changes when new trend data is imported; results are reused this long
+TRENDING_SKILLS_TTL_SECONDS = 3600
+
+# LIMIT value MySQL documents for "all remaining rows" when only an offset is wanted
+MYSQL_MAX_LIMIT = 18446744073709551615
+
+UUID7_RAND_B_MASK = (1 << 62) - 1
+
+# Rows per multi-VALUES INSERT, to stay well under max_allowed_packet
+INSERT_BATCH_SIZE = 1000
+
+# Read from the environment once per process and shared read-only
+CONNECTION_CONFIG = MappingProxyType({
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': int(os.getenv('DB_PORT', '3306')),
+    'user': os.getenv('DB_USER', 'root'),
+    'password': os.getenv('DB_PASSWORD', 'Aayush@2014'),
+    'database': os.getenv('DB_NAME', 'ml_project'),
+    'charset': 'utf8mb4',
+    'autocommit': False,
+    'use_unicode': True
+})
+
 class DatabaseManager:
     """Database connection and query management"""
     
     def __init__(self):
-        self.connection_config = {
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'port': int(os.getenv('DB_PORT', '3306')),
-            'user': os.getenv('DB_USER', 'root'),
-            'password': os.getenv('DB_PASSWORD', 'Aayush@2014'),
-            'database': os.getenv('DB_NAME', 'ml_project'),
-            'charset': 'utf8mb4',
-            'autocommit': False,
-            'use_unicode': True
-        }
+        self.connection_config = CONNECTION_CONFIG
+        
+        # Created on first use so importing this module never opens a connection
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        
+        # connection -> (server session id, {query: prepared cursor}); entries go away with the connection
+        self._prepared_statements = weakref.WeakKeyDictionary()
+        self._prepared_lock = threading.Lock()
     
-    def get_connection(self):
-        """Get database connection"""
+    def _create_pool(self) -> pooling.MySQLConnectionPool:
+        """Create the connection pool, retrying with the native password plugin on a protocol mismatch"""
+        pool_config = {
+            'pool_name': 'skill_gap_analyzer',
+            'pool_size': DB_POOL_SIZE,
+            'pool_reset_session': False
+        }
         try:
-            # Try with default config first
-            connection = mysql.connector.connect(**self.connection_config)
-            return connection
+            return pooling.MySQLConnectionPool(**pool_config, **self.connection_config)
         except mysql.connector.Error as e:
             if "Protocol mismatch" in str(e):
                 # Try with older protocol version
                 logger.warning("MySQL protocol mismatch, trying with older protocol...")
-                fallback_config = self.connection_config.copy()
-                fallback_config['auth_plugin'] = 'mysql_native_password'
+                self.connection_config = MappingProxyType(
+                    {**self.connection_config, 'auth_plugin': 'mysql_native_password'}
+                )
                 try:
-                    connection = mysql.connector.connect(**fallback_config)
-                    return connection
+                    return pooling.MySQLConnectionPool(**pool_config, **self.connection_config)
                 except mysql.connector.Error as fallback_error:
                     logger.error(f"Fallback connection also failed: {fallback_error}")
                     raise fallback_error
             else:
                 raise e
+    
+    def get_connection(self):
+        """Get a pooled database connection; close() returns it to the pool"""
+        try:
+            if self._pool is None:
+                with self._pool_lock:
+                    if self._pool is None:
+                        self._pool = self._create_pool()
+            return self._pool.get_connection()
+        except PoolError:
+            # Every pooled connection is checked out; don't fail the request
+            logger.warning("Connection pool exhausted, opening a dedicated connection")
+            return mysql.connector.connect(**self.connection_config)
         except Error as e:
             logger.error(f"Error connecting to MySQL: {e}")
             raise
@@ -69,7 +121,13 @@ class DatabaseManager:
             if cursor:
                 cursor.close()
             if connection:
-                connection.close()
+                # Pooled sessions are not reset on release, so end any open
+                # transaction (including a read snapshot) before handing it back
+                try:
+                    if connection.in_transaction:
+                        connection.rollback()
+                finally:
+                    connection.close()
     
     def execute_query(self, query: str, params: tuple = None, fetch: str = None) -> Any:
         """
@@ -101,16 +159,113 @@ class DatabaseManager:
             else:
                 return cursor.rowcount
     
-    def execute_stored_procedure(self, proc_name: str, params: tuple = ()) -> List[Dict]:
-        """Execute a stored procedure"""
+    def execute_prepared(self, query: str, params: tuple, fetch: str = 'one') -> Any:
+        """
+        Execute a read query as a server-side prepared statement
+        
+        The statement is prepared once per pooled connection and reused on
+        later calls, so the server skips parsing and the binary protocol is used.
+        
+        Args:
+            query: SQL query string
+            params: Query parameters
+            fetch: 'one' or 'all'
+            
+        Returns:
+            Query results
+        """
+        connection = self.get_connection()
+        # Pooled connections are wrappers handed out per checkout; cache on the
+        # underlying connection, which lives as long as the socket
+        raw_connection = getattr(connection, '_cnx', connection)
+        # The pool reconnects that same object when the socket dies (e.g. after
+        # wait_timeout), and statement ids from the old session mean nothing there
+        session_id = raw_connection.connection_id
+        try:
+            with self._prepared_lock:
+                cached = self._prepared_statements.get(raw_connection)
+                if cached is None or cached[0] != session_id:
+                    # Drop stale cursors without closing them: closing would free
+                    # whatever statement now holds the same id in the new session
+                    cached = (session_id, {})
+                    self._prepared_statements[raw_connection] = cached
+                statements = cached[1]
+                cursor = statements.get(query)
+            if cursor is None:
+                cursor = raw_connection.cursor(prepared=True, dictionary=True)
+                with self._prepared_lock:
+                    statements[query] = cursor
+            
+            try:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+            except Error:
+                with self._prepared_lock:
+                    statements.pop(query, None)
+                cursor.close()
+                raise
+            
+            if fetch == 'one':
+                return rows[0] if rows else None
+            return rows
+        except Error as e:
+            logger.error(f"Database error: {e}")
+            raise
+        finally:
+            try:
+                if connection.in_transaction:
+                    connection.rollback()
+            finally:
+                connection.close()
+    
+    def iter_stored_procedure(self, proc_name: str, params: tuple = ()) -> Generator[Dict, None, None]:
+        """
+        Execute a stored procedure and yield its rows in fetch-sized chunks
+        
+        The connection stays checked out until the generator is exhausted or
+        closed, so consume it promptly.
+        """
         with self.get_db_cursor() as cursor:
             cursor.callproc(proc_name, params)
             
-            results = []
             for result in cursor.stored_results():
-                results.extend(result.fetchall())
+                while True:
+                    rows = result.fetchmany(STORED_RESULT_FETCH_SIZE)
+                    if not rows:
+                        break
+                    yield from rows
+    
+    def execute_stored_procedure(self, proc_name: str, params: tuple = ()) -> List[Dict]:
+        """Execute a stored procedure"""
+        return list(self.iter_stored_procedure(proc_name, params))
+    
+    def insert_many(self, query: str, rows: List[tuple], batch_size: int = INSERT_BATCH_SIZE) -> int:
+        """
+        Insert rows with multi-row VALUES statements in a single transaction
+        
+        Args:
+            query: INSERT statement up to and including the VALUES keyword
+            rows: Parameter tuples, one per row
+            batch_size: Maximum rows per statement
             
-            return results
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+        
+        placeholder = "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+        
+        with self.get_db_cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                cursor.execute(
+                    query + ", ".join([placeholder] * len(batch)),
+                    tuple(value for row in batch for value in row)
+                )
+            cursor.connection.commit()
+        
+        return len(rows)
     
     def insert_and_get_id(self, query: str, params: tuple) -> str:
         """Insert record and return the inserted ID"""
@@ -122,15 +277,43 @@ class DatabaseManager:
 # Database utility functions
 db_manager = DatabaseManager()
 
+def _page_limit(limit: Optional[int]) -> int:
+    """MySQL has no OFFSET without LIMIT; use its documented 'all rows' value"""
+    return MYSQL_MAX_LIMIT if limit is None else limit
+
+def _new_ids(count: int) -> List[str]:
+    """
+    Generate count time-ordered UUIDv7 strings from a single urandom call
+    
+    Ids start with the millisecond timestamp, so new primary keys land at the
+    right edge of the InnoDB index instead of splitting random pages. Within
+    a batch the 12-bit rand_a field holds a counter, carrying into the
+    timestamp, so the ids are also ordered among themselves.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    random_bytes = os.urandom(8 * count)
+    ids = []
+    for i in range(count):
+        rand_b = int.from_bytes(random_bytes[8 * i:8 * i + 8], 'big') & UUID7_RAND_B_MASK
+        value = (
+            (timestamp_ms + (i >> 12)) << 80
+            | 0x7 << 76              # version
+            | (i & 0xFFF) << 64      # rand_a, used as a sequence
+            | 0b10 << 62             # RFC 4122 variant
+            | rand_b
+        )
+        ids.append(str(uuid.UUID(int=value)))
+    return ids
+
 def get_user_by_email(email: str) -> Optional[Dict[str, Any]]:
     """Get user by email address"""
     query = "SELECT * FROM users WHERE email = %s"
-    return db_manager.execute_query(query, (email,), fetch='one')
+    return db_manager.execute_prepared(query, (email,))
 
 def get_user_by_id(user_id: int) -> Optional[Dict[str, Any]]:
     """Get user by ID"""
     query = "SELECT * FROM users WHERE id = %s"
-    return db_manager.execute_query(query, (user_id,), fetch='one')
+    return db_manager.execute_prepared(query, (user_id,))
 
 def create_user(username: str, email: str, hashed_password: str) -> int:
     """Create a new user"""
@@ -140,6 +323,11 @@ def create_user(username: str, email: str, hashed_password: str) -> int:
     """
     return db_manager.insert_and_get_id(query, (username, email, hashed_password))
 
+def update_user_password_hash(user_id: int, hashed_password: str):
+    """Replace a user's stored password hash"""
+    query = "UPDATE users SET password_hash = %s WHERE id = %s"
+    db_manager.execute_query(query, (hashed_password, user_id))
+
 def create_user_session(user_id: int, session_token: str, expires_at: str) -> int:
     """Create a new user session"""
     query = """
@@ -156,7 +344,7 @@ def get_user_session(session_token: str) -> Optional[Dict[str, Any]]:
         JOIN users u ON us.user_id = u.id 
         WHERE us.session_token = %s AND us.expires_at > NOW()
     """
-    return db_manager.execute_query(query, (session_token,), fetch='one')
+    return db_manager.execute_prepared(query, (session_token,))
 
 def delete_user_session(session_token: str) -> int:
     """Delete user session by token"""
@@ -168,14 +356,33 @@ def delete_expired_sessions() -> int:
     query = "DELETE FROM user_sessions WHERE expires_at < NOW()"
     return db_manager.execute_query(query)
 
-def get_all_skills() -> List[Dict[str, Any]]:
-    """Get all skills from database"""
+def get_all_skills(prefix: str = "", limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Get skills from database, ordered by name
+    
+    Args:
+        prefix: Only return skills whose name starts with this text
+        limit: Maximum number of skills to return; None returns all of them
+    """
     query = """
         SELECT id, name, description, category, is_hot_technology, is_in_demand
         FROM skills
-        ORDER BY name
     """
-    return db_manager.execute_query(query, fetch='all')
+    params = []
+    
+    # A prefix LIKE and the LIMIT both run on the idx_name index, so the
+    # server neither filesorts nor ships the whole table
+    if prefix:
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        query += " WHERE name LIKE %s"
+        params.append(escaped + '%')
+    
+    query += " ORDER BY name"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    
+    return db_manager.execute_query(query, tuple(params), fetch='all')
 
 def get_all_job_professions() -> List[Dict[str, Any]]:
     """Get all job professions from database"""
@@ -201,8 +408,7 @@ def search_skills(search_term: str) -> List[Dict[str, Any]]:
 def save_resume(user_id: str, filename: str, file_path: str, raw_text: str, 
                 file_size: int, mime_type: str) -> str:
     """Save resume to database"""
-    import uuid
-    resume_id = str(uuid.uuid4())
+    resume_id = _new_ids(1)[0]
     
     query = """
         INSERT INTO resumes (id, user_id, filename, file_path, raw_text, file_size, mime_type, processed)
@@ -213,18 +419,14 @@ def save_resume(user_id: str, filename: str, file_path: str, raw_text: str,
 
 def save_resume_skills(resume_id: str, skills_data: List[Dict]) -> int:
     """Save extracted skills for a resume"""
-    count = 0
-    for skill_data in skills_data:
-        import uuid
-        skill_id = str(uuid.uuid4())
-        
-        query = """
-            INSERT INTO resume_skills (id, resume_id, skill_id, original_text, confidence_score, 
-                                     match_type, position_start, position_end)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        params = (
-            skill_id,
+    query = """
+        INSERT INTO resume_skills (id, resume_id, skill_id, original_text, confidence_score, 
+                                 match_type, position_start, position_end)
+        VALUES 
+    """
+    rows = [
+        (
+            row_id,
             resume_id,
             skill_data['skill_id'],
             skill_data['original_text'],
@@ -233,18 +435,14 @@ def save_resume_skills(resume_id: str, skills_data: List[Dict]) -> int:
             skill_data.get('position_start'),
             skill_data.get('position_end')
         )
-        db_manager.execute_query(query, params)
-        count += 1
-    
-    return count
+        for row_id, skill_data in zip(_new_ids(len(skills_data)), skills_data)
+    ]
+    return db_manager.insert_many(query, rows)
 
 def save_skill_analysis(user_id: str, resume_id: str, target_job_id: str, 
                        analysis_results: Dict, visualizations: Dict) -> str:
     """Save skill gap analysis results"""
-    import uuid
-    import json
-    
-    analysis_id = str(uuid.uuid4())
+    analysis_id = _new_ids(1)[0]
     
     query = """
         INSERT INTO skill_analyses (id, user_id, resume_id, target_job_id, proficiency_score,
@@ -265,26 +463,46 @@ def save_skill_analysis(user_id: str, resume_id: str, target_job_id: str,
     db_manager.execute_query(query, params)
     return analysis_id
 
-def get_user_analyses(user_id: str) -> List[Dict[str, Any]]:
-    """Get all analyses for a user"""
-    return db_manager.execute_stored_procedure('GetUserSkillAnalyses', (user_id,))
+def get_user_analyses(user_id: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Get analyses for a user, newest first
+    
+    Args:
+        user_id: User ID
+        offset: Number of analyses to skip
+        limit: Maximum number of analyses to return; None returns all of them
+    """
+    if limit is None and not offset:
+        return db_manager.execute_stored_procedure('GetUserSkillAnalyses', (user_id,))
+    
+    # Same rows as GetUserSkillAnalyses, paged on the server
+    query = """
+        SELECT 
+            sa.*,
+            jp.name as job_name,
+            jp.category as job_category,
+            r.filename as resume_filename
+        FROM skill_analyses sa
+        JOIN job_professions jp ON sa.target_job_id = jp.id
+        JOIN resumes r ON sa.resume_id = r.id
+        WHERE sa.user_id = %s
+        ORDER BY sa.created_at DESC
+        LIMIT %s OFFSET %s
+    """
+    return db_manager.execute_query(query, (user_id, _page_limit(limit), offset), fetch='all')
 
 def save_course_recommendations(analysis_id: str, recommendations: List[Dict]) -> int:
     """Save course recommendations"""
-    count = 0
-    for rec in recommendations:
-        import uuid
-        rec_id = str(uuid.uuid4())
-        
-        query = """
-            INSERT INTO course_recommendations (id, analysis_id, skill_name, course_title,
-                                              course_provider, course_url, course_description,
-                                              estimated_duration, difficulty_level, rating, price,
-                                              recommendation_score, priority)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        params = (
-            rec_id,
+    query = """
+        INSERT INTO course_recommendations (id, analysis_id, skill_name, course_title,
+                                          course_provider, course_url, course_description,
+                                          estimated_duration, difficulty_level, rating, price,
+                                          recommendation_score, priority)
+        VALUES 
+    """
+    rows = [
+        (
+            row_id,
             analysis_id,
             rec['skill_name'],
             rec['course_title'],
@@ -298,14 +516,39 @@ def save_course_recommendations(analysis_id: str, recommendations: List[Dict]) -
             rec['recommendation_score'],
             rec['priority']
         )
-        db_manager.execute_query(query, params)
-        count += 1
-    
-    return count
+        for row_id, rec in zip(_new_ids(len(recommendations)), recommendations)
+    ]
+    return db_manager.insert_many(query, rows)
 
-def get_course_recommendations(analysis_id: str) -> List[Dict[str, Any]]:
-    """Get course recommendations for an analysis"""
-    return db_manager.execute_stored_procedure('GetCourseRecommendations', (analysis_id,))
+def get_course_recommendations(analysis_id: str, offset: int = 0,
+                               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Get course recommendations for an analysis, most important first
+    
+    Args:
+        analysis_id: Analysis ID
+        offset: Number of recommendations to skip
+        limit: Maximum number of recommendations to return; None returns all of them
+    """
+    if limit is None and not offset:
+        return db_manager.execute_stored_procedure('GetCourseRecommendations', (analysis_id,))
+    
+    # Same rows as GetCourseRecommendations, paged on the server
+    query = """
+        SELECT 
+            cr.*
+        FROM course_recommendations cr
+        WHERE cr.analysis_id = %s
+        ORDER BY 
+            CASE cr.priority 
+                WHEN 'Critical' THEN 1
+                WHEN 'Important' THEN 2
+                WHEN 'Nice-to-have' THEN 3
+            END,
+            cr.recommendation_score DESC
+        LIMIT %s OFFSET %s
+    """
+    return db_manager.execute_query(query, (analysis_id, _page_limit(limit), offset), fetch='all')
 
 def update_resume_processed_status(resume_id: str, processed: bool = True):
     """Update resume processed status"""
@@ -315,19 +558,34 @@ def update_resume_processed_status(resume_id: str, processed: bool = True):
 def get_skill_by_name(skill_name: str) -> Optional[Dict[str, Any]]:
     """Get skill by name"""
     query = "SELECT * FROM skills WHERE name = %s"
-    return db_manager.execute_query(query, (skill_name,), fetch='one')
+    return db_manager.execute_prepared(query, (skill_name,))
+
+# (monotonic expiry, rows) for the whole view, sliced per request
+_trending_skills_cache = None
+_trending_skills_lock = threading.Lock()
 
 def get_trending_skills(limit: int = 20) -> List[Dict[str, Any]]:
-    """Get trending skills"""
-    query = "SELECT * FROM v_trending_skills LIMIT %s"
-    return db_manager.execute_query(query, (limit,), fetch='all')
+    """Get trending skills, re-reading the view at most every TRENDING_SKILLS_TTL_SECONDS"""
+    global _trending_skills_cache
+    
+    with _trending_skills_lock:
+        entry = _trending_skills_cache
+        if entry is None or entry[0] <= time.monotonic():
+            rows = db_manager.execute_query("SELECT * FROM v_trending_skills", fetch='all') or []
+            entry = _trending_skills_cache = (time.monotonic() + TRENDING_SKILLS_TTL_SECONDS, rows)
+    
+    return entry[1][:limit]
 
 def get_user_dashboard_data(user_id: str) -> Dict[str, Any]:
     """Get user dashboard statistics"""
-    results = db_manager.execute_stored_procedure('GetUserDashboardData', (user_id,))
-    
-    dashboard_data = {}
-    for row in results:
-        dashboard_data[row['data_type']] = row['count']
-    
-    return dashboard_data
+    # One row of aggregates: skill_analyses is scanned once for both of its
+    # statistics and the resume count comes from a scalar subquery
+    query = """
+        SELECT
+            COALESCE(SUM(sa.created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)), 0) AS recent_analyses,
+            ROUND(AVG(sa.proficiency_score), 2) AS avg_proficiency,
+            (SELECT COUNT(*) FROM resumes r WHERE r.user_id = %s) AS total_resumes
+        FROM skill_analyses sa
+        WHERE sa.user_id = %s
+    """
+    return db_manager.execute_query(query, (user_id, user_id), fetch='one') or {}
@@ -2,18 +2,17 @@
 File processing utilities for resume upload and text extraction
 """
 
+import multiprocessing
 import os
+import re
 import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, Optional, Union
 import logging
 from fastapi import UploadFile, HTTPException
-try:
-    import magic
-    MAGIC_AVAILABLE = True
-except ImportError:
-    MAGIC_AVAILABLE = False
-    magic = None
 import PyPDF2
 import docx
 from io import BytesIO
@@ -21,6 +20,99 @@ from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Below this many pages a PDF is parsed in-process; worker hand-off costs more
+# than it saves on a typical one or two page resume
+PDF_PARALLEL_MIN_PAGES = 8
+
+# Uploads are copied to disk in chunks of this size
+UPLOAD_COPY_CHUNK_BYTES = 1 << 20
+
+# Leading bytes kept for content sniffing; enough to reach the word/ entries
+# of a .docx archive
+MIME_SNIFF_BYTES = 4096
+
+MIME_TYPES_BY_EXTENSION = {
+    'pdf': 'application/pdf',
+    'doc': 'application/msword',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'txt': 'text/plain'
+}
+
+# Extensions whose content is sniffed instead of trusting the name; legacy
+# .doc uploads are often really .docx files
+UNTRUSTED_EXTENSIONS = frozenset({'doc'})
+
+# Magic numbers of the supported binary formats
+PDF_SIGNATURE = b'%PDF'
+ZIP_SIGNATURE = b'PK\x03\x04'
+OLE_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# Text cleanup patterns. Space runs and characters that might interfere with
+# NLP both become a single space, so they share one pass
+_NEWLINE_RUN_RE = re.compile(r'\n{2,}')
+_SPACE_RUN_OR_SPECIAL_RE = re.compile(r' {2,}|[^\w\s\.\-\+\#\(\)\[\]@]')
+
+# Shared by all extractions and started on first use, so no request pays
+# for process start-up more than once
+_pdf_executor = None
+_pdf_executor_lock = threading.Lock()
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    """Return the process pool used for parallel PDF page extraction"""
+    global _pdf_executor
+    if _pdf_executor is None:
+        with _pdf_executor_lock:
+            if _pdf_executor is None:
+                # Never fork the threaded server process (model state, held locks);
+                # workers start from a clean forkserver, or spawn where that is missing
+                start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                _pdf_executor = ProcessPoolExecutor(
+                    max_workers=os.cpu_count(),
+                    mp_context=multiprocessing.get_context(start_method)
+                )
+    return _pdf_executor
+
+def _discard_pdf_executor(executor: ProcessPoolExecutor):
+    """Drop a broken pool so the next parallel extraction starts a fresh one"""
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is executor:
+            _pdf_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_pdf_executor():
+    """Stop the PDF worker processes, if they were started"""
+    global _pdf_executor
+    with _pdf_executor_lock:
+        executor, _pdf_executor = _pdf_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def _extract_pdf_pages(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) of a PDF; runs in a worker process"""
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[page_num].extract_text() for page_num in range(start, stop)]
+
+def _sniff_mime_type(head: bytes) -> Optional[str]:
+    """Identify PDF, Word and plain-text content from its first bytes"""
+    if head.startswith(PDF_SIGNATURE):
+        return MIME_TYPES_BY_EXTENSION['pdf']
+    if head.startswith(ZIP_SIGNATURE):
+        # .docx is a ZIP archive whose entries live under word/
+        return MIME_TYPES_BY_EXTENSION['docx'] if b'word/' in head else 'application/zip'
+    if head.startswith(OLE_SIGNATURE):
+        return MIME_TYPES_BY_EXTENSION['doc']
+    if b'\x00' not in head:
+        try:
+            head.decode('utf-8')
+            return MIME_TYPES_BY_EXTENSION['txt']
+        except UnicodeDecodeError as e:
+            # A multi-byte character may be cut off at the end of the head
+            if len(head) == MIME_SNIFF_BYTES and e.reason == 'unexpected end of data':
+                return MIME_TYPES_BY_EXTENSION['txt']
+    return None
+
 class FileProcessor:
     """File processing and text extraction utilities"""
     
@@ -61,23 +153,18 @@ class FileProcessor:
     
     def get_mime_type(self, file_content: bytes, filename: str) -> str:
         """Get MIME type of file"""
-        if MAGIC_AVAILABLE:
-            try:
-                # Try to detect MIME type using python-magic
-                mime = magic.from_buffer(file_content, mime=True)
-                return mime
-            except:
-                pass
+        # Known extensions map straight to a MIME type without sniffing
+        extension = self.get_file_extension(filename)
+        mime_type = MIME_TYPES_BY_EXTENSION.get(extension)
+        if mime_type and extension not in UNTRUSTED_EXTENSIONS:
+            return mime_type
+        
+        sniffed_type = _sniff_mime_type(file_content[:MIME_SNIFF_BYTES])
+        if sniffed_type:
+            return sniffed_type
         
         # Fallback to extension-based detection
-        extension = self.get_file_extension(filename)
-        mime_mapping = {
-            'pdf': 'application/pdf',
-            'doc': 'application/msword',
-            'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            'txt': 'text/plain'
-        }
-        return mime_mapping.get(extension, 'application/octet-stream')
+        return mime_type or 'application/octet-stream'
     
     def save_uploaded_file(self, file: UploadFile, user_id: str) -> Dict[str, Any]:
         """
@@ -87,8 +174,8 @@ class FileProcessor:
             Dict with file information
         """
         try:
-            # Read file content
-            file_content = file.file.read()
+            # Only the head of the upload is kept in memory, for MIME sniffing
+            file_head = file.file.read(MIME_SNIFF_BYTES)
             file.file.seek(0)  # Reset file pointer
             
             # Validate file
@@ -109,15 +196,17 @@ class FileProcessor:
             # Save file
             file_path = user_folder / safe_filename
             with open(file_path, "wb") as buffer:
-                buffer.write(file_content)
+                # Stream in fixed-size chunks so memory stays flat for large uploads
+                shutil.copyfileobj(file.file, buffer, UPLOAD_COPY_CHUNK_BYTES)
+                file_size = buffer.tell()
             
             # Get file info
             file_info = {
                 "original_filename": file.filename,
                 "saved_filename": safe_filename,
                 "file_path": str(file_path),
-                "file_size": len(file_content),
-                "mime_type": self.get_mime_type(file_content, file.filename),
+                "file_size": file_size,
+                "mime_type": self.get_mime_type(file_head, file.filename),
                 "file_extension": file_extension
             }
             
@@ -144,7 +233,7 @@ class FileProcessor:
                 return self.extract_text_from_pdf(file_path)
             elif mime_type in ['application/msword', 
                               'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
-                return self.extract_text_from_word(file_path)
+                return self.extract_text_from_word(file_path, mime_type)
             elif mime_type == 'text/plain':
                 return self.extract_text_from_txt(file_path)
             else:
@@ -158,27 +247,46 @@ class FileProcessor:
     def extract_text_from_pdf(self, file_path: str) -> str:
         """Extract text from PDF file"""
         try:
-            text = ""
+            workers = os.cpu_count() or 1
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
+                page_count = len(pdf_reader.pages)
+                parallel = workers > 1 and page_count >= PDF_PARALLEL_MIN_PAGES
+                
+                if not parallel:
+                    pages = [page.extract_text() for page in pdf_reader.pages]
+            
+            if parallel:
+                # Page text decoding is CPU-bound; give each worker a contiguous
+                # range so it parses the document once
+                chunk = -(-page_count // workers)
+                executor = _get_pdf_executor()
+                try:
+                    futures = [
+                        executor.submit(_extract_pdf_pages, file_path, start, min(start + chunk, page_count))
+                        for start in range(0, page_count, chunk)
+                    ]
+                    pages = [page_text for future in futures for page_text in future.result()]
+                except BrokenProcessPool:
+                    # A worker died (e.g. OOM-killed); replace the pool and parse here
+                    logger.warning(f"PDF worker pool broke while extracting {file_path}; retrying in-process")
+                    _discard_pdf_executor(executor)
+                    pages = _extract_pdf_pages(file_path, 0, page_count)
             
+            text = "".join((page_text or "") + "\n" for page_text in pages)
             return self.clean_extracted_text(text)
             
         except Exception as e:
             logger.error(f"Error extracting text from PDF {file_path}: {e}")
             return ""
     
-    def extract_text_from_word(self, file_path: str) -> str:
+    def extract_text_from_word(self, file_path: str, mime_type: Optional[str] = None) -> str:
         """Extract text from Word document (.doc or .docx)"""
         try:
-            if file_path.endswith('.docx'):
+            # Sniffed content wins over the name: a .doc upload may really be .docx
+            if file_path.endswith('.docx') or mime_type == MIME_TYPES_BY_EXTENSION['docx']:
                 doc = docx.Document(file_path)
-                text = ""
-                for paragraph in doc.paragraphs:
-                    text += paragraph.text + "\n"
+                text = "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
                 return self.clean_extracted_text(text)
             else:
                 # For .doc files, you might need to use python-docx2txt or other libraries
@@ -207,16 +315,11 @@ class FileProcessor:
         if not text:
             return ""
         
-        # Remove excessive whitespace
-        import re
-        text = re.sub(r'\n+', '\n', text)
-        text = re.sub(r' +', ' ', text)
-        text = text.strip()
-        
-        # Remove special characters that might interfere with NLP
-        text = re.sub(r'[^\w\s\.\-\+\#\(\)\[\]@]', ' ', text)
-        
-        return text
+        # Stripping first gives the same result as stripping after the
+        # whitespace collapse. Spaces left by removed special characters are
+        # not collapsed again, as before
+        text = _NEWLINE_RUN_RE.sub('\n', text.strip())
+        return _SPACE_RUN_OR_SPECIAL_RE.sub(' ', text)
     
     def delete_file(self, file_path: str) -> bool:
         """Delete a file from disk"""
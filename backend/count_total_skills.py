@@ -87,13 +87,16 @@ skill_patterns = {
     r'\bproblem\s*solving\b': 'Problem Solving',
 }
 
+# Compile every pattern once up front
+compiled_patterns = [
+    (re.compile(pattern, re.IGNORECASE), skill_name)
+    for pattern, skill_name in skill_patterns.items()
+]
+
 text_lower = sample_text.lower()
-found_skills = set()
 
 # Find all skills without limit
-for pattern, skill_name in skill_patterns.items():
-    if re.search(pattern, text_lower, re.IGNORECASE):
-        found_skills.add(skill_name)
+found_skills = {skill_name for regex, skill_name in compiled_patterns if regex.search(text_lower)}
 
 # Convert to list and sort
 all_skills = sorted(list(found_skills))
@@ -28,8 +28,9 @@ patterns = {
 
 print("Testing patterns on lowercase text:")
 for skill_name, pattern in patterns.items():
-    matches = re.findall(pattern, text_lower, re.IGNORECASE)
-    found = bool(re.search(pattern, text_lower, re.IGNORECASE))
+    regex = re.compile(pattern, re.IGNORECASE)
+    matches = regex.findall(text_lower)
+    found = bool(matches)
     print(f"{skill_name}: Pattern '{pattern}' -> Found: {found}, Matches: {matches}")
 
 print()
@@ -20,31 +20,31 @@ print("Sample text:", sample_text)
 print()
 
 # Test C++ pattern
-cpp_patterns = [
+cpp_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in (
     r'\bc\+\+\b',
     r'c\+\+',
     r'\bc\+\+',
     r'c\+\+\b'
-]
+)]
 
 print("C++ pattern testing:")
 for pattern in cpp_patterns:
-    matches = re.findall(pattern, sample_text, re.IGNORECASE)
-    found = bool(re.search(pattern, sample_text, re.IGNORECASE))
-    print(f"  Pattern: {pattern} -> Found: {found}, Matches: {matches}")
+    matches = pattern.findall(sample_text)
+    found = bool(matches)
+    print(f"  Pattern: {pattern.pattern} -> Found: {found}, Matches: {matches}")
 
 print()
 
 # Test Tailwind CSS pattern
-tailwind_patterns = [
+tailwind_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in (
     r'\btailwind\s+css\b',
     r'\btailwind\s*css\b',
     r'tailwind\s+css',
     r'tailwind css'
-]
+)]
 
 print("Tailwind CSS pattern testing:")
 for pattern in tailwind_patterns:
-    matches = re.findall(pattern, sample_text, re.IGNORECASE)
-    found = bool(re.search(pattern, sample_text, re.IGNORECASE))
-    print(f"  Pattern: {pattern} -> Found: {found}, Matches: {matches}")
+    matches = pattern.findall(sample_text)
+    found = bool(matches)
+    print(f"  Pattern: {pattern.pattern} -> Found: {found}, Matches: {matches}")
@@ -3,7 +3,7 @@
 Debug step-by-step skill extraction process
 """
 
-import re
+from demo_main import SKILL_PATTERNS, extract_skills_from_text, normalize_skill_text
 
 # Sample text from test  
 sample_text = """
@@ -15,35 +15,27 @@ sample_text = """
     • CS Fundamentals: Data Structures and Algorithms (DSA), problem-solving, DBMS, OOP, CN, OS.
 """
 
-# Convert to lowercase like the test does
-text_lower = sample_text.lower()
+# Lowercase and collapse whitespace exactly like the extraction function
+text_normalized = normalize_skill_text(sample_text)
 
-# Define the exact patterns from the extraction function (subset for testing)
-skill_patterns = {
-    r'\breact(?:\.js)?\b': 'React.js',
-    r'\btailwind\s+css\b': 'Tailwind CSS',
-    r'\bhtml\b': 'HTML',
-    r'\bcss\b(?!\.)': 'CSS',
-    r'\bbootstrap\b': 'Bootstrap',
-    r'\bjava\b(?!script)': 'Java',
-    r'c\+\+': 'C++',
-    r'\bjavascript\b': 'JavaScript'
-}
+# Use the exact compiled patterns from the extraction function (subset for testing)
+debug_skills = {'React.js', 'Tailwind CSS', 'HTML', 'CSS', 'Bootstrap', 'Java', 'C++', 'JavaScript'}
+skill_patterns = [(pattern, skill_name) for pattern, skill_name in SKILL_PATTERNS if skill_name in debug_skills]
 
 print("Testing specific patterns step by step:")
-print("Text:", text_lower)
+print("Text:", text_normalized)
 print()
 
 found_skills = set()
 
 # Test each pattern individually
-for pattern, skill_name in skill_patterns.items():
-    match = re.search(pattern, text_lower, re.IGNORECASE)
+for pattern, skill_name in skill_patterns:
+    match = pattern.search(text_normalized)
     if match:
         found_skills.add(skill_name)
-        print(f"✅ Pattern '{pattern}' -> Matched: '{match.group()}' -> Skill: '{skill_name}'")
+        print(f"✅ Pattern '{pattern.pattern}' -> Matched: '{match.group()}' -> Skill: '{skill_name}'")
     else:
-        print(f"❌ Pattern '{pattern}' -> No match -> Skill: '{skill_name}'")
+        print(f"❌ Pattern '{pattern.pattern}' -> No match -> Skill: '{skill_name}'")
 
 print()
 print("Found skills set:", found_skills)
@@ -51,8 +43,7 @@ print("Found skills list (sorted):", sorted(list(found_skills)))
 
 print()
 print("Testing with the actual extraction function:")
-from demo_main import extract_skills_from_text
-actual_result = extract_skills_from_text(text_lower)
+actual_result = extract_skills_from_text(text_normalized, normalized=True)
 print("Actual function result:", actual_result)
 
 # Check if our expected skills are in the result
@@ -5,13 +5,28 @@ FastAPI backend with basic functionality (without ML dependencies)
 """
 
 from fastapi import FastAPI, HTTPException, Depends, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional, Dict, Any
 import uvicorn
+import codecs
+import hashlib
+import itertools
 import json
+import random
+import re
+import threading
+import zlib
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Skill Gap Analyzer API - Demo",
@@ -34,6 +49,13 @@ app.add_middleware(
 users_db = {}
 resumes_db = {}
 analyses_db = {}
+# zlib-compressed resume text by resume ID, kept out of the API-facing records
+resume_contents = {}
+
+# IDs are never reused, even after a record is deleted
+_user_ids = itertools.count(1)
+_resume_ids = itertools.count(1)
+_analysis_ids = itertools.count(1)
 
 # Pydantic models
 class UserCreate(BaseModel):
@@ -77,168 +99,298 @@ class AnalysisResult(BaseModel):
     recommended_courses: List[Dict[str, Any]]
     analysis_date: datetime
 
+# Skill patterns with word boundaries to avoid false positives
+_SKILL_PATTERN_SOURCES = {
+    # Programming Languages - exact matches with better patterns
+    r'\bjava\b(?!script)': 'Java',  # Java but not JavaScript
+    r'c\+\+': 'C++',  # C++ without strict word boundaries
+    r'\bc#\b': 'C#',
+    r'\b(?<!\w)c(?!\+|#|ss|n|ertif|omputer|loud)\b': 'C',  # C but not C++, C#, CSS, CN, etc.
+    r'\bjavascript\b': 'JavaScript',
+    r'\bjs\b(?!on)': 'JavaScript',  # js but not json
+    r'\btypescript\b': 'TypeScript',
+    r'\bpython\b': 'Python',
+    r'\bdart\b': 'Dart',
+    r'\bphp\b': 'PHP',
+    r'\bruby\b': 'Ruby',
+    r'\bkotlin\b': 'Kotlin',
+    r'\bswift\b': 'Swift',
+    r'\bscala\b': 'Scala',
+    r'\bgo\b(?!ogle)': 'Go',  # Go but not Google
+    r'\br\b(?!eact)': 'R',  # R but not React
+    
+    # Web Technologies with more precise patterns
+    r'\bhtml\b': 'HTML',
+    r'\bcss\b(?!\.)': 'CSS',  # CSS but not .css file extension
+    r'\breact(?:\.js)?\b': 'React.js',
+    r'\bnode(?:\.js)?\b': 'Node.js',
+    r'\bexpress(?:\.js)?\b': 'Express.js',
+    r'\bangular\b': 'Angular',
+    r'\bvue(?:\.js)?\b': 'Vue.js',
+    r'\bnext(?:\.js)?\b': 'Next.js',
+    r'\bmern stack\b': 'MERN Stack',
+    r'\bbootstrap\b': 'Bootstrap',
+    r'\btailwind css\b': 'Tailwind CSS',
+    r'\bsass\b': 'SASS',
+    r'\bscss\b': 'SCSS',
+    
+    # Databases
+    r'\bmysql\b': 'MySQL',
+    r'\bmongodb\b': 'MongoDB',
+    r'\bmongo\b(?!db)': 'MongoDB',
+    r'\bpostgresql\b': 'PostgreSQL',
+    r'\bpostgres\b': 'PostgreSQL',
+    r'\bredis\b': 'Redis',
+    r'\bsqlite\b': 'SQLite',
+    r'\boracle\b': 'Oracle',
+    r'\bsql ?server\b': 'SQL Server',
+    
+    # Mobile & Frameworks
+    r'\bflutter\b': 'Flutter',
+    r'\bfirebase\b': 'Firebase',
+    r'\bandroid\b': 'Android',
+    r'\bios\b': 'iOS',
+    r'\breact ?native\b': 'React Native',
+    r'\bdjango\b': 'Django',
+    r'\bflask\b': 'Flask',
+    r'\bfastapi\b': 'FastAPI',
+    r'\bspring\b': 'Spring',
+    r'\blaravel\b': 'Laravel',
+    
+    # Cloud & DevOps - be more specific
+    r'\baws\b': 'AWS',
+    r'\bazure\b': 'Azure',
+    r'\bgoogle ?cloud\b': 'Google Cloud',
+    r'\bgcp\b': 'Google Cloud Platform',
+    r'\bdocker\b': 'Docker',
+    r'\bkubernetes\b': 'Kubernetes',
+    r'\bk8s\b': 'Kubernetes',
+    r'\bgit\b(?!hub|lab)': 'Git',  # Git but not GitHub/GitLab
+    r'\bgithub\b': 'GitHub',
+    r'\bgitlab\b': 'GitLab',
+    
+    # Concepts and Skills
+    r'\boop\b': 'OOP',
+    r'\bobject ?oriented\b': 'OOP',
+    r'\bdata ?structures\b': 'Data Structures',
+    r'\balgorithms\b': 'Algorithms',
+    r'\bdsa\b': 'Data Structures and Algorithms',
+    r'\bdbms\b': 'DBMS',
+    r'\bdatabase ?design\b': 'Database Design',
+    r'\bproblem ?solving\b': 'Problem Solving',
+    r'\bsystem ?design\b': 'System Design',
+    r'\bsoftware ?architecture\b': 'Software Architecture',
+    r'\bdesign ?patterns\b': 'Design Patterns',
+    r'\bmachine ?learning\b': 'Machine Learning',
+    r'\bml\b(?! ?project)': 'Machine Learning',  # ML but not "ML PROJECT"
+    r'\bdeep ?learning\b': 'Deep Learning',
+    r'\bartificial ?intelligence\b': 'Artificial Intelligence',
+    r'\bai\b(?! ?powered)': 'AI',  # AI but not "AI powered"
+    r'\bdata ?analysis\b': 'Data Analysis',
+    r'\bdata ?science\b': 'Data Science',
+    
+    # Testing and Development Practices
+    r'\bunit ?testing\b': 'Unit Testing',
+    r'\btdd\b': 'Test Driven Development',
+    r'\btesting\b': 'Testing',
+    r'\bdebugging\b': 'Debugging',
+    r'\bagile\b': 'Agile',
+    r'\bscrum\b': 'Scrum',
+    r'\bdevops\b': 'DevOps',
+    r'\bci/cd\b': 'CI/CD',
+    
+    # Operating Systems
+    r'\blinux\b': 'Linux',
+    r'\bunix\b': 'Unix',
+    r'\bwindows\b': 'Windows',
+    r'\bmacos\b': 'macOS',
+    r'\bubuntu\b': 'Ubuntu',
+    
+    # Tools and IDEs
+    r'\bvscode\b': 'VS Code',
+    r'\bvisual ?studio\b': 'Visual Studio',
+    r'\bintellij\b': 'IntelliJ IDEA',
+    r'\beclipse\b': 'Eclipse',
+    
+    # Data Science Libraries
+    r'\btensorflow\b': 'TensorFlow',
+    r'\bpytorch\b': 'PyTorch',
+    r'\bpandas\b': 'Pandas',
+    r'\bnumpy\b': 'NumPy',
+    r'\bscikit-learn\b': 'Scikit-learn',
+    r'\bmatplotlib\b': 'Matplotlib',
+    r'\bjupyter\b': 'Jupyter',
+    
+    # Networking (be more specific)
+    r'\btcp/ip\b': 'TCP/IP',
+    r'\bhttp\b(?!s)': 'HTTP',
+    r'\bhttps\b': 'HTTPS',
+    r'\bssl/tls\b': 'SSL/TLS',
+    r'\bssl tls\b': 'SSL/TLS',
+    
+    # Other Technologies
+    r'\bgraphql\b': 'GraphQL',
+    r'\brest ?api\b': 'REST API',
+    r'\bapi ?development\b': 'API Development',
+    r'\bmicroservices\b': 'Microservices',
+    r'\bjson\b': 'JSON',
+    r'\bxml\b': 'XML',
+}
+
+# Compiled once at import; patterns run against lowercased, whitespace-collapsed text
+SKILL_PATTERNS = tuple(
+    (re.compile(pattern), skill_name)
+    for pattern, skill_name in _SKILL_PATTERN_SOURCES.items()
+)
+
+# Plain word-boundary literals, optionally joined by ' ' / ' ?' (e.g. react ?native)
+# A trailing (?!word|...) is kept too; its alternatives are checked in _literal_variants
+_LITERAL_PATTERN_RE = re.compile(
+    r'\\b([a-z0-9/\-]+(?: \??[a-z0-9/\-]+)*)(?:\(\?:\\\.js\)\?)?\\b(?:\(\?!([a-z0-9|]+)\))?'
+)
+_WHITESPACE_RUN_RE = re.compile(r'\s+')
+# Leading literal after \b (and an optional (?<!\w)) that any match must contain
+_REQUIRED_LITERAL_RE = re.compile(r'\\b(?:\(\?<!\\w\))?([a-z0-9#/\-]+)(?![?*+{])')
+
+def _literal_variants(pattern: str) -> Optional[List[str]]:
+    """Return the lowercase literals a pattern matches, or None if it needs the regex engine"""
+    match = _LITERAL_PATTERN_RE.fullmatch(pattern)
+    if not match:
+        return None
+
+    body, lookahead = match.groups()
+    # \b only behaves like a plain word boundary when both ends are word characters
+    if not (body[0].isalnum() and body[-1].isalnum()):
+        return None
+    # After the closing \b the next character is never a word character, so a
+    # lookahead like (?!script) in \bjava\b(?!script) can never fail
+    if lookahead and not all(alternative[:1].isalnum() for alternative in lookahead.split('|')):
+        return None
+
+    variants = ['']
+    for piece in re.split(r'( \??)', body):
+        if piece == ' ':
+            variants = [v + ' ' for v in variants]
+        elif piece == ' ?':
+            variants = [v + sep for v in variants for sep in (' ', '')]
+        else:
+            variants = [v + piece for v in variants]
+    return variants
+
+def _split_skill_patterns():
+    """Split the skill table into (literal, skill) pairs and leftover compiled regexes"""
+    literal_skills = []
+    regex_patterns = []
+
+    for (pattern, skill_name), (compiled, _) in zip(_SKILL_PATTERN_SOURCES.items(), SKILL_PATTERNS):
+        variants = _literal_variants(pattern)
+        if variants is None:
+            regex_patterns.append((compiled, skill_name))
+        else:
+            literal_skills.extend((literal, skill_name) for literal in variants)
+
+    return tuple(literal_skills), tuple(regex_patterns)
+
+def _build_skill_automaton(literal_skills):
+    """Load every literal into one Aho-Corasick automaton"""
+    automaton = ahocorasick.Automaton()
+    for literal, skill_name in literal_skills:
+        automaton.add_word(literal, (len(literal), skill_name))
+    automaton.make_automaton()
+    return automaton
+
+def _required_literal(pattern: str) -> str:
+    """Return a substring every match of the pattern contains ('' if none is known)"""
+    match = _REQUIRED_LITERAL_RE.match(pattern)
+    return match.group(1) if match else ''
+
+LITERAL_SKILLS, _regex_skill_patterns = _split_skill_patterns()
+SKILL_AUTOMATON = _build_skill_automaton(LITERAL_SKILLS) if AHOCORASICK_AVAILABLE else None
+
+# Each regex carries its required literal, so an absent skill costs one substring check
+BOUNDARY_SENSITIVE_PATTERNS = tuple(
+    (pattern, skill_name, _required_literal(pattern.pattern))
+    for pattern, skill_name in _regex_skill_patterns
+)
+
+def _is_word_char(text: str, index: int) -> bool:
+    return 0 <= index < len(text) and (text[index].isalnum() or text[index] == '_')
+
+def _contains_bounded_literal(text: str, literal: str) -> bool:
+    """str.find equivalent of searching for \\b<literal>\\b"""
+    index = text.find(literal)
+    while index != -1:
+        if not _is_word_char(text, index - 1) and not _is_word_char(text, index + len(literal)):
+            return True
+        index = text.find(literal, index + 1)
+    return False
+
+# Extraction results kept per content digest, so reprocessing unchanged text is a lookup
+EXTRACTION_CACHE_SIZE = 1024
+_extraction_cache = OrderedDict()
+_extraction_cache_lock = threading.Lock()
+
+def content_digest(text: str) -> str:
+    """Stable digest of resume text used to key cached extraction results"""
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
 # Basic skill extraction function
-def extract_skills_from_text(text: str) -> list:
-    """Extract skills from text content using precise pattern matching"""
-    
-    import re
-    
-    # Define precise skill patterns with word boundaries to avoid false positives
-    skill_patterns = {
-        # Programming Languages - exact matches with better patterns
-        r'\bjava\b(?!script)': 'Java',  # Java but not JavaScript
-        r'c\+\+': 'C++',  # C++ without strict word boundaries
-        r'\bc#\b': 'C#',
-        r'\b(?<!\w)c(?!\+|#|ss|n|ertif|omputer|loud)\b': 'C',  # C but not C++, C#, CSS, CN, etc.
-        r'\bjavascript\b': 'JavaScript',
-        r'\bjs\b(?!on)': 'JavaScript',  # js but not json
-        r'\btypescript\b': 'TypeScript',
-        r'\bpython\b': 'Python',
-        r'\bdart\b': 'Dart',
-        r'\bphp\b': 'PHP',
-        r'\bruby\b': 'Ruby',
-        r'\bkotlin\b': 'Kotlin',
-        r'\bswift\b': 'Swift',
-        r'\bscala\b': 'Scala',
-        r'\bgo\b(?!ogle)': 'Go',  # Go but not Google
-        r'\br\b(?!eact)': 'R',  # R but not React
-        
-        # Web Technologies with more precise patterns
-        r'\bhtml\b': 'HTML',
-        r'\bcss\b(?!\.)': 'CSS',  # CSS but not .css file extension
-        r'\breact(?:\.js)?\b': 'React.js',
-        r'\bnode(?:\.js)?\b': 'Node.js',
-        r'\bexpress(?:\.js)?\b': 'Express.js',
-        r'\bangular\b': 'Angular',
-        r'\bvue(?:\.js)?\b': 'Vue.js',
-        r'\bnext(?:\.js)?\b': 'Next.js',
-        r'\bmern\s+stack\b': 'MERN Stack',
-        r'\bbootstrap\b': 'Bootstrap',
-        r'\btailwind\s+css\b': 'Tailwind CSS',
-        r'\bsass\b': 'SASS',
-        r'\bscss\b': 'SCSS',
-        
-        # Databases
-        r'\bmysql\b': 'MySQL',
-        r'\bmongodb\b': 'MongoDB',
-        r'\bmongo\b(?!db)': 'MongoDB',
-        r'\bpostgresql\b': 'PostgreSQL',
-        r'\bpostgres\b': 'PostgreSQL',
-        r'\bredis\b': 'Redis',
-        r'\bsqlite\b': 'SQLite',
-        r'\boracle\b': 'Oracle',
-        r'\bsql\s*server\b': 'SQL Server',
-        
-        # Mobile & Frameworks
-        r'\bflutter\b': 'Flutter',
-        r'\bfirebase\b': 'Firebase',
-        r'\bandroid\b': 'Android',
-        r'\bios\b': 'iOS',
-        r'\breact\s*native\b': 'React Native',
-        r'\bdjango\b': 'Django',
-        r'\bflask\b': 'Flask',
-        r'\bfastapi\b': 'FastAPI',
-        r'\bspring\b': 'Spring',
-        r'\blaravel\b': 'Laravel',
-        
-        # Cloud & DevOps - be more specific
-        r'\baws\b': 'AWS',
-        r'\bazure\b': 'Azure',
-        r'\bgoogle\s*cloud\b': 'Google Cloud',
-        r'\bgcp\b': 'Google Cloud Platform',
-        r'\bdocker\b': 'Docker',
-        r'\bkubernetes\b': 'Kubernetes',
-        r'\bk8s\b': 'Kubernetes',
-        r'\bgit\b(?!hub|lab)': 'Git',  # Git but not GitHub/GitLab
-        r'\bgithub\b': 'GitHub',
-        r'\bgitlab\b': 'GitLab',
-        
-        # Concepts and Skills
-        r'\boop\b': 'OOP',
-        r'\bobject\s*oriented\b': 'OOP',
-        r'\bdata\s*structures\b': 'Data Structures',
-        r'\balgorithms\b': 'Algorithms',
-        r'\bdsa\b': 'Data Structures and Algorithms',
-        r'\bdbms\b': 'DBMS',
-        r'\bdatabase\s*design\b': 'Database Design',
-        r'\bproblem\s*solving\b': 'Problem Solving',
-        r'\bsystem\s*design\b': 'System Design',
-        r'\bsoftware\s*architecture\b': 'Software Architecture',
-        r'\bdesign\s*patterns\b': 'Design Patterns',
-        r'\bmachine\s*learning\b': 'Machine Learning',
-        r'\bml\b(?!\s*project)': 'Machine Learning',  # ML but not "ML PROJECT"
-        r'\bdeep\s*learning\b': 'Deep Learning',
-        r'\bartificial\s*intelligence\b': 'Artificial Intelligence',
-        r'\bai\b(?!\s*powered)': 'AI',  # AI but not "AI powered"
-        r'\bdata\s*analysis\b': 'Data Analysis',
-        r'\bdata\s*science\b': 'Data Science',
-        
-        # Testing and Development Practices
-        r'\bunit\s*testing\b': 'Unit Testing',
-        r'\btdd\b': 'Test Driven Development',
-        r'\btesting\b': 'Testing',
-        r'\bdebugging\b': 'Debugging',
-        r'\bagile\b': 'Agile',
-        r'\bscrum\b': 'Scrum',
-        r'\bdevops\b': 'DevOps',
-        r'\bci/cd\b': 'CI/CD',
-        
-        # Operating Systems
-        r'\blinux\b': 'Linux',
-        r'\bunix\b': 'Unix',
-        r'\bwindows\b': 'Windows',
-        r'\bmacos\b': 'macOS',
-        r'\bubuntu\b': 'Ubuntu',
-        
-        # Tools and IDEs
-        r'\bvscode\b': 'VS Code',
-        r'\bvisual\s*studio\b': 'Visual Studio',
-        r'\bintellij\b': 'IntelliJ IDEA',
-        r'\beclipse\b': 'Eclipse',
-        
-        # Data Science Libraries
-        r'\btensorflow\b': 'TensorFlow',
-        r'\bpytorch\b': 'PyTorch',
-        r'\bpandas\b': 'Pandas',
-        r'\bnumpy\b': 'NumPy',
-        r'\bscikit-learn\b': 'Scikit-learn',
-        r'\bmatplotlib\b': 'Matplotlib',
-        r'\bjupyter\b': 'Jupyter',
-        
-        # Networking (be more specific)
-        r'\btcp/ip\b': 'TCP/IP',
-        r'\bhttp\b(?!s)': 'HTTP',
-        r'\bhttps\b': 'HTTPS',
-        r'\bssl/tls\b': 'SSL/TLS',
-        r'\bssl\s+tls\b': 'SSL/TLS',
-        
-        # Other Technologies
-        r'\bgraphql\b': 'GraphQL',
-        r'\brest\s*api\b': 'REST API',
-        r'\bapi\s*development\b': 'API Development',
-        r'\bmicroservices\b': 'Microservices',
-        r'\bjson\b': 'JSON',
-        r'\bxml\b': 'XML',
-    }
+def normalize_skill_text(text: str) -> str:
+    """Lowercase text and collapse whitespace runs, the form the skill patterns match against"""
+    return _WHITESPACE_RUN_RE.sub(' ', text.lower())
+
+def extract_skills_from_text(text: str, normalized: bool = False) -> list:
+    """
+    Extract skills from text content, reusing results for previously seen text
+    
+    Args:
+        text: Resume text
+        normalized: The text already went through normalize_skill_text, so the
+            lowercase/whitespace pass is skipped
+    """
+    
+    digest = content_digest(text)
+    with _extraction_cache_lock:
+        cached = _extraction_cache.get(digest)
+        if cached is not None:
+            _extraction_cache.move_to_end(digest)
+            return list(cached)
+    
+    skills_list = _match_skills(text if normalized else normalize_skill_text(text))
+    with _extraction_cache_lock:
+        _extraction_cache[digest] = tuple(skills_list)
+        if len(_extraction_cache) > EXTRACTION_CACHE_SIZE:
+            _extraction_cache.popitem(last=False)
+    
+    return skills_list
+
+def _match_skills(text: str) -> list:
+    """Extract skills from normalized text content using precise pattern matching"""
     
     found_skills = set()
     
-    # Use regex patterns for more precise matching
-    for pattern, skill_name in skill_patterns.items():
-        if re.search(pattern, text, re.IGNORECASE):
-            found_skills.add(skill_name)
-    
-    # Convert to list and limit to reasonable number
-    skills_list = list(found_skills)
+    # Plain literal skills: one Aho-Corasick pass, or str.find per literal without it
+    if SKILL_AUTOMATON is not None:
+        for end, (length, skill_name) in SKILL_AUTOMATON.iter(text):
+            if skill_name in found_skills:
+                continue
+            if not _is_word_char(text, end - length) and not _is_word_char(text, end + 1):
+                found_skills.add(skill_name)
+    else:
+        for literal, skill_name in LITERAL_SKILLS:
+            if skill_name not in found_skills and _contains_bounded_literal(text, literal):
+                found_skills.add(skill_name)
     
-    # Remove duplicates and sort
-    skills_list = sorted(list(set(skills_list)))
+    # Use regex patterns for the lookaround-sensitive skills
+    for pattern, skill_name, literal in BOUNDARY_SENSITIVE_PATTERNS:
+        if literal in text and pattern.search(text):
+            found_skills.add(skill_name)
     
     # If no skills found, return empty list instead of generic skills
-    if not skills_list:
+    if not found_skills:
         return []
     
-    return skills_list[:30]  # Allow up to 30 skills for more comprehensive extraction
+    return sorted(found_skills)[:30]  # Allow up to 30 skills for more comprehensive extraction
 
 # Demo data
 SAMPLE_SKILLS = [
@@ -277,6 +429,26 @@ SAMPLE_COURSES = [
     }
 ]
 
+# (course, provider, level, title) with the searchable fields lowercased once
+_SAMPLE_COURSES_LOWER = tuple(
+    (course, course["provider"].lower(), course["level"].lower(), course["title"].lower())
+    for course in SAMPLE_COURSES
+)
+
+# Simulated job requirements: 32 fixed draws for each size from 8 to 12 skills
+JOB_SKILL_DRAWS_PER_SIZE = 32
+_job_skill_rng = random.Random(0)
+JOB_SKILL_ROTATIONS = tuple(
+    frozenset(_job_skill_rng.sample(SAMPLE_SKILLS, k))
+    for k in range(8, 13)
+    for _ in range(JOB_SKILL_DRAWS_PER_SIZE)
+)
+
+def job_skills_for_title(job_title: str) -> frozenset:
+    """Pick the simulated required skills for a job title, stable across requests and restarts"""
+    key = zlib.crc32(job_title.strip().lower().encode('utf-8', 'surrogatepass'))
+    return JOB_SKILL_ROTATIONS[key % len(JOB_SKILL_ROTATIONS)]
+
 # Routes
 @app.get("/")
 async def root():
@@ -292,7 +464,7 @@ async def register(user: UserCreate):
     if user.email in users_db:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    user_id = len(users_db) + 1
+    user_id = next(_user_ids)
     users_db[user.email] = {
         "id": user_id,
         "email": user.email,
@@ -333,32 +505,45 @@ async def get_profile():
         "created_at": datetime.now()
     }
 
+# Upload read size; each chunk is decoded and lowercased on its own
+UPLOAD_READ_CHUNK_BYTES = 64 * 1024
+
+async def read_upload_text(file: UploadFile) -> str:
+    """Decode and lowercase an upload chunk by chunk (UTF-8, else latin-1), then collapse whitespace"""
+    for encoding in ('utf-8', 'latin-1'):
+        decoder = codecs.getincrementaldecoder(encoding)()
+        pieces = []
+        try:
+            while chunk := await file.read(UPLOAD_READ_CHUNK_BYTES):
+                pieces.append(decoder.decode(chunk).lower())
+            pieces.append(decoder.decode(b'', final=True).lower())
+            # Same result as normalize_skill_text, without a second lowercase pass
+            return _WHITESPACE_RUN_RE.sub(' ', ''.join(pieces))
+        except UnicodeDecodeError:
+            # Not UTF-8; latin-1 accepts any byte sequence
+            await file.seek(0)
+
+def compress_resume_text(text: str) -> bytes:
+    return zlib.compress(text.encode('utf-8', 'surrogatepass'))
+
+def decompress_resume_text(blob: bytes) -> str:
+    return zlib.decompress(blob).decode('utf-8', 'surrogatepass')
+
 # Resume routes
 @app.post("/api/v1/resumes/upload")
 async def upload_resume(file: UploadFile = File(...)):
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file provided")
     
-    # Simulate file processing
-    resume_id = len(resumes_db) + 1
-    
-    # Read file content for basic skill extraction
-    content = await file.read()
-    content_text = ""
+    # Read file content for basic skill extraction, already normalized for matching
+    content_text = await read_upload_text(file)
     
-    try:
-        # Try to decode as text
-        content_text = content.decode('utf-8').lower()
-    except:
-        try:
-            # Try other encoding
-            content_text = content.decode('latin-1').lower()
-        except:
-            content_text = str(content).lower()
-    
-    # Basic skill extraction based on content
-    extracted_skills = extract_skills_from_text(content_text)
+    # Basic skill extraction based on content, off the event loop
+    extracted_skills = await run_in_threadpool(extract_skills_from_text, content_text, normalized=True)
+    compressed_text = await run_in_threadpool(compress_resume_text, content_text)
     
+    # Simulate file processing
+    resume_id = next(_resume_ids)
     resume_info = {
         "id": resume_id,
         "filename": file.filename,
@@ -366,10 +551,11 @@ async def upload_resume(file: UploadFile = File(...)):
         "upload_date": datetime.now(),
         "extracted_skills": extracted_skills,
         "content_type": file.content_type,
-        "file_content": content_text  # Store for reprocessing
+        "extracted_skills_hash": content_digest(content_text)
     }
     
     resumes_db[resume_id] = resume_info
+    resume_contents[resume_id] = compressed_text  # Store for reprocessing
     
     return {"message": "Resume uploaded successfully", "resume": resume_info}
 
@@ -389,6 +575,7 @@ async def delete_resume(resume_id: int):
         raise HTTPException(status_code=404, detail="Resume not found")
     
     del resumes_db[resume_id]
+    resume_contents.pop(resume_id, None)
     return {"message": "Resume deleted successfully"}
 
 @app.post("/api/v1/resumes/{resume_id}/reprocess")
@@ -396,19 +583,28 @@ async def reprocess_resume(resume_id: int):
     if resume_id not in resumes_db:
         raise HTTPException(status_code=404, detail="Resume not found")
     
+    # Keep the record itself; it may be deleted while extraction runs
+    resume = resumes_db[resume_id]
+    
     # Update status to processing
-    resumes_db[resume_id]["status"] = "processing"
+    resume["status"] = "processing"
     
     # Re-extract skills from stored content
-    stored_content = resumes_db[resume_id].get("file_content", "")
-    if stored_content:
-        new_skills = extract_skills_from_text(stored_content)
-        resumes_db[resume_id]["extracted_skills"] = new_skills
+    compressed_text = resume_contents.get(resume_id)
+    if compressed_text:
+        stored_content = await run_in_threadpool(decompress_resume_text, compressed_text)
+        
+        # Skills were extracted from exactly this text already
+        stored_hash = content_digest(stored_content)
+        if stored_hash != resume.get("extracted_skills_hash"):
+            new_skills = await run_in_threadpool(extract_skills_from_text, stored_content, normalized=True)
+            resume["extracted_skills"] = new_skills
+            resume["extracted_skills_hash"] = stored_hash
     
     # Mark as completed
-    resumes_db[resume_id]["status"] = "completed"
+    resume["status"] = "completed"
     
-    return {"message": "Resume reprocessing completed", "resume": resumes_db[resume_id]}
+    return {"message": "Resume reprocessing completed", "resume": resume}
 
 # Analysis routes
 @app.post("/api/v1/analysis/analyze")
@@ -419,29 +615,24 @@ async def perform_analysis(analysis_request: AnalysisRequest):
     resume = resumes_db[analysis_request.resume_id]
     
     # Simulate skill gap analysis
-    import random
-    
-    user_skills = resume["extracted_skills"]
+    user_skills = frozenset(resume["extracted_skills"])
     
-    # Generate random job requirements based on job title
-    job_skills = random.sample(SAMPLE_SKILLS, k=random.randint(8, 12))
+    # Generate job requirements based on job title
+    job_skills = job_skills_for_title(analysis_request.job_title)
     
     # Find strong skills (intersection)
-    strong_skills = list(set(user_skills) & set(job_skills))
+    strong_skills = list(job_skills & user_skills)
     
     # Find missing skills (job requirements not in user skills)
-    missing_skills = list(set(job_skills) - set(user_skills))
+    missing_skills = list(job_skills - user_skills)
     
     # Calculate overall score
-    if len(job_skills) > 0:
-        overall_score = (len(strong_skills) / len(job_skills)) * 100
-    else:
-        overall_score = 0.0
+    overall_score = 100.0 * len(strong_skills) / len(job_skills)
     
     # Generate course recommendations for missing skills
     recommended_courses = random.sample(SAMPLE_COURSES, k=min(3, len(SAMPLE_COURSES)))
     
-    analysis_id = len(analyses_db) + 1
+    analysis_id = next(_analysis_ids)
     analysis_result = {
         "id": analysis_id,
         "resume_id": analysis_request.resume_id,
@@ -500,15 +691,17 @@ async def search_courses(
     provider: Optional[str] = None,
     level: Optional[str] = None
 ):
-    courses = SAMPLE_COURSES.copy()
-    
-    # Simple filtering
-    if provider:
-        courses = [c for c in courses if c["provider"].lower() == provider.lower()]
-    if level:
-        courses = [c for c in courses if c["level"].lower() == level.lower()]
-    if query:
-        courses = [c for c in courses if query.lower() in c["title"].lower()]
+    provider = provider.lower() if provider else None
+    level = level.lower() if level else None
+    query = query.lower() if query else None
+    
+    # Simple filtering, all filters in one pass
+    courses = [
+        course for course, course_provider, course_level, course_title in _SAMPLE_COURSES_LOWER
+        if (provider is None or course_provider == provider)
+        and (level is None or course_level == level)
+        and (query is None or query in course_title)
+    ]
     
     return {"courses": courses}
 
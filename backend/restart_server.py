@@ -3,6 +3,7 @@
 Backend server restart script for Skill Gap Analyzer
 """
 
+import select
 import subprocess
 import sys
 import time
@@ -10,22 +11,32 @@ import signal
 import os
 from pathlib import Path
 
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Seconds to wait for the old server to exit after it is signalled
+SHUTDOWN_TIMEOUT_SECONDS = 5
+
+def is_backend_cmdline(cmdline):
+    """Check whether a process command line is the uvicorn backend"""
+    return any('uvicorn' in arg for arg in cmdline) and any('app.main:app' in arg for arg in cmdline)
+
 def find_backend_process():
     """Find running backend process"""
     try:
-        # On Windows, use tasklist
-        if os.name == 'nt':
-            result = subprocess.run(['tasklist', '/FI', 'IMAGENAME eq python.exe'], 
-                                  capture_output=True, text=True)
-            lines = result.stdout.split('\n')
-            for line in lines:
-                if 'python.exe' in line and 'uvicorn' in line:
-                    # Extract PID
-                    parts = line.split()
-                    if len(parts) > 1:
-                        return int(parts[1])
+        if PSUTIL_AVAILABLE:
+            # process_iter reads the requested attributes in one oneshot() batch per process
+            for proc in psutil.process_iter(['pid', 'cmdline']):
+                if proc.info['pid'] != os.getpid() and is_backend_cmdline(proc.info['cmdline'] or []):
+                    return proc.info['pid']
+        elif os.name == 'nt':
+            # tasklist never shows command lines, so there is no fallback on Windows
+            print("psutil is required to find the backend process on Windows")
         else:
-            # On Unix-like systems, use ps
+            # On Unix-like systems without psutil, use ps
             result = subprocess.run(['ps', 'aux'], capture_output=True, text=True)
             lines = result.stdout.split('\n')
             for line in lines:
@@ -50,6 +61,37 @@ def kill_backend_process(pid):
         print(f"❌ Error killing process {pid}: {e}")
         return False
 
+def wait_for_process_exit(pid, timeout=SHUTDOWN_TIMEOUT_SECONDS):
+    """Wait until a process exits; returns False if it is still running after the timeout"""
+    # Linux 5.3+: a pidfd becomes readable the moment the process exits
+    if hasattr(os, 'pidfd_open'):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pidfd = None
+        if pidfd is not None:
+            try:
+                poller = select.poll()
+                poller.register(pidfd, select.POLLIN)
+                return bool(poller.poll(timeout * 1000))
+            finally:
+                os.close(pidfd)
+    
+    # Elsewhere psutil waits natively (WaitForSingleObject on Windows)
+    if PSUTIL_AVAILABLE:
+        try:
+            psutil.Process(pid).wait(timeout)
+        except psutil.NoSuchProcess:
+            pass
+        except psutil.TimeoutExpired:
+            return False
+        return True
+    
+    time.sleep(2)
+    return True
+
 def start_backend_server():
     """Start the backend server"""
     try:
@@ -83,7 +125,8 @@ def main():
         print(f"🔍 Found running backend process: {pid}")
         if kill_backend_process(pid):
             print("⏳ Waiting for process to terminate...")
-            time.sleep(2)
+            if not wait_for_process_exit(pid):
+                print(f"⚠️  Process {pid} still running after {SHUTDOWN_TIMEOUT_SECONDS}s")
     else:
         print("ℹ️  No running backend process found")
     
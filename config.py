@@ -10,10 +10,16 @@ class Config:
     # JWT Configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-secret-key-here')
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
+    ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', '2'))
+    ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', str(64 * 1024)))  # KiB
+    ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', '2'))
     
     # Model Paths
     SPACY_MODEL_PATH = os.getenv('SPACY_MODEL_PATH', './backend/trained_models/skill_extraction_model')
+    SPACY_GPU_ID = int(os.getenv('SPACY_GPU_ID', '-1'))  # -1 keeps skill extraction on CPU
     SBERT_MODEL_NAME = os.getenv('SBERT_MODEL_NAME', 'all-MiniLM-L6-v2')
+    USE_ONNX_ENCODER = os.getenv('USE_ONNX_ENCODER', 'False').lower() == 'true'
+    ONNX_MODEL_PATH = os.getenv('ONNX_MODEL_PATH', './backend/trained_models/onnx_encoder')
     
     # File Upload Settings
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', './backend/data/uploads')